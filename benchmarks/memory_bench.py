@@ -0,0 +1,196 @@
+"""Benchmark how many objects the search allocates per node.
+
+The search plays and undoes moves on a single bitboard, fills move lists
+that are allocated once per ply and returns plain values, so a node should
+build no containers at all. This runs the positions of
+``benchmarks/positions/search_sets.json`` with every instruction of the
+engine's code traced, and counts the instructions that build an object:
+tuples, lists, dicts, sets, slices, iterators (every ``for`` loop makes
+one), functions, and loads of builtins such as ``range`` that are only
+used to build one. Each counts as one allocation, whether or not the
+object is freed at once, so temporaries show up as well as what is kept.
+
+The report gives, per set, the nodes searched and nodes per second (from
+an untraced pass), then allocations per node split by where they happen:
+in the search and its move ordering, in playing and undoing moves
+(``Position``, ``Geometry`` and the evaluator), and in the transposition
+table, whose stored entries are meant to be kept. The last column is the
+transient peak memory: the peak traced by tracemalloc less what is still
+allocated when the search returns, which is mostly the table's new
+entries::
+
+    python benchmarks/memory_bench.py --sets early_6x7 mid_6x7
+
+Tracing runs the search a hundred times slower, so the count is taken at
+``--trace-depth``; allocations per node hardly depend on the depth. Plain
+ints and floats are objects in CPython too; they are short-lived and
+recycled by the allocator, and are not counted here.
+"""
+import argparse
+import dis
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import engine
+from engine import Position, Searcher, WindowEvaluator
+from engine.evaluation import WEIGHT_PRESETS, mirror_symmetric
+
+from search_bench import DEFAULT_SETS, load_sets
+
+# Instructions that build a new object other than a number
+_ALLOCATING_OPS = frozenset((
+    "BUILD_TUPLE", "BUILD_LIST", "BUILD_MAP", "BUILD_CONST_KEY_MAP", "BUILD_SET", "BUILD_SLICE",
+    "BINARY_SLICE", "BUILD_STRING", "FORMAT_VALUE", "GET_ITER", "MAKE_FUNCTION",
+))
+# Builtins that are loaded to build an object
+_ALLOCATING_BUILTINS = frozenset((
+    "range", "list", "tuple", "dict", "set", "frozenset", "sorted", "enumerate", "zip", "map",
+    "filter", "reversed", "iter",
+))
+
+# Spelled like the modules' own file names, which keep the ".." above
+_ENGINE_DIR = os.path.dirname(engine.__file__)
+# Engine modules by the part of a node they serve
+_PARTS = {
+    "search": ("search.py", "ordering.py", "stats.py"),
+    "moves": ("position.py", "geometry.py", "evaluation.py"),
+    "table": ("transposition.py",),
+}
+
+
+class AllocationCounter:
+    """Counts the allocating instructions run by the engine inside ``Searcher._minimax``.
+
+    Counting starts when the search reaches its root node, so the
+    per-search setup of ``Searcher.minimax`` is left out.
+
+    Attributes:
+        counts (Counter): Allocations per part of the node, a key of ``_PARTS``.
+    """
+
+    def __init__(self):
+        """Initialize the AllocationCounter class."""
+        self.counts = Counter()
+        self._parts = {
+            os.path.join(_ENGINE_DIR, name): part for part, names in _PARTS.items() for name in names
+        }
+        self._root_code = Searcher._minimax.__code__
+        self._offsets = {}
+        self._level = 0
+
+    def _allocating_offsets(self, code):
+        offsets = self._offsets.get(code)
+        if offsets is None:
+            offsets = self._offsets[code] = frozenset(
+                instruction.offset for instruction in dis.get_instructions(code)
+                if instruction.opname in _ALLOCATING_OPS
+                or instruction.opname == "LOAD_GLOBAL" and instruction.argval in _ALLOCATING_BUILTINS
+            )
+        return offsets
+
+    def _call(self, frame, event, arg):
+        if frame.f_code.co_filename not in self._parts:
+            return None
+        if frame.f_code is self._root_code:
+            self._level += 1
+        frame.f_trace_lines = False
+        frame.f_trace_opcodes = True
+        return self._step
+
+    def _step(self, frame, event, arg):
+        code = frame.f_code
+        if event == "opcode":
+            if self._level and frame.f_lasti in self._allocating_offsets(code):
+                self.counts[self._parts[code.co_filename]] += 1
+        elif event == "return" and code is self._root_code:
+            self._level -= 1
+        return self._step
+
+    def __enter__(self):
+        sys.settrace(self._call)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.settrace(None)
+
+
+def _prepare(position_set, moves, preset):
+    position = Position.from_moves(moves, position_set["rows"], position_set["cols"],
+                                   connect=position_set["connect"])
+    WindowEvaluator(position, *WEIGHT_PRESETS[preset])
+    return position
+
+
+def run(position_set, preset="connect4", depth=None, trace_depth=5):
+    """Search every position of a set and return the allocation results."""
+    depth = depth or position_set["depth"]
+    trace_depth = min(depth, trace_depth)
+    nodes = traced_nodes = 0
+    seconds = 0.0
+    counter = AllocationCounter()
+    peak = 0
+
+    for moves in position_set["positions"]:
+        position = _prepare(position_set, moves, preset)
+        piece = position.player
+        searcher = Searcher(lambda p: p.evaluator.score(piece), piece,
+                            symmetric=mirror_symmetric(WEIGHT_PRESETS[preset], position.cols))
+        # Warm up the searcher's own buffers, then start from an empty table
+        searcher.minimax(position, 1)
+        searcher.table.clear()
+        start = time.perf_counter()
+        searcher.minimax(position, depth)
+        seconds += time.perf_counter() - start
+        nodes += searcher.nodes
+
+        # Allocation pass, traced
+        searcher.table.clear()
+        with counter:
+            searcher.minimax(position, trace_depth)
+        traced_nodes += searcher.nodes
+
+        # Memory pass
+        searcher.table.clear()
+        tracemalloc.start()
+        searcher.minimax(position, depth)
+        current, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak = max(peak, traced_peak - current)
+
+    return {
+        "depth": depth,
+        "trace_depth": trace_depth,
+        "positions": len(position_set["positions"]),
+        "nodes": nodes,
+        "nodes_per_sec": nodes / seconds if seconds else None,
+        "allocations_per_node": {part: counter.counts[part] / traced_nodes for part in _PARTS},
+        "transient_peak_kb": peak / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the search's allocations per node.")
+    parser.add_argument("--sets", nargs="+", help="names of the position sets to run; all by default")
+    parser.add_argument("--positions", default=DEFAULT_SETS, help="position set file")
+    parser.add_argument("--preset", default="connect4", choices=list(WEIGHT_PRESETS))
+    parser.add_argument("--depth", type=int, help="search depth instead of each set's own")
+    parser.add_argument("--trace-depth", type=int, default=5, help="depth of the traced, counting pass")
+    args = parser.parse_args()
+
+    sets = load_sets(args.positions)
+    print(f"{'set':12} {'depth':>5} {'nodes':>9} {'kN/s':>7} {'search/n':>8} {'moves/n':>8} {'table/n':>8} "
+          f"{'peak KB':>8}")
+    for name in args.sets or list(sets):
+        result = run(sets[name], args.preset, args.depth, args.trace_depth)
+        per_node = result["allocations_per_node"]
+        print(f"{name:12} {result['depth']:5} {result['nodes']:9} {result['nodes_per_sec'] / 1000:7.1f} "
+              f"{per_node['search']:8.2f} {per_node['moves']:8.2f} {per_node['table']:8.2f} "
+              f"{result['transient_peak_kb']:8.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
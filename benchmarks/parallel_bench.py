@@ -0,0 +1,94 @@
+"""Benchmark the root-splitting parallel search against the plain search.
+
+Every position of a set from ``benchmarks/positions/search_sets.json`` is
+searched by iterative deepening to the set's depth, once by ``Searcher``
+and once by ``ParallelSearcher`` for each worker count. The report gives
+the mean time per position and the speedup over ``Searcher``; the column
+``moves`` counts the positions where the parallel search chose the same
+column as ``Searcher``::
+
+    python benchmarks/parallel_bench.py --sets mid_6x7 --workers 1 2 4
+
+The worker pools are started before timing, so the time to spawn them is
+left out. Speedups above one need at least as many CPUs as workers.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from engine import Position, Searcher, WindowEvaluator
+from engine.evaluation import WEIGHT_PRESETS, mirror_symmetric
+from engine.parallel import ParallelSearcher
+
+from search_bench import DEFAULT_SETS, load_sets
+
+
+def _prepare(position_set, moves, weights):
+    position = Position.from_moves(moves, position_set["rows"], position_set["cols"],
+                                   connect=position_set["connect"])
+    WindowEvaluator(position, *weights)
+    return position
+
+
+def run(position_set, weights, workers, depth=None):
+    """Search every position of a set and return the mean times and matching moves."""
+    depth = depth or position_set["depth"]
+    positions = position_set["positions"]
+    seconds = 0.0
+    columns = []
+    for moves in positions:
+        position = _prepare(position_set, moves, weights)
+        piece = position.player
+        searcher = Searcher(lambda p: p.evaluator.score(piece), piece,
+                            symmetric=mirror_symmetric(weights, position.cols))
+        start = time.perf_counter()
+        columns.append(searcher.iterative_deepening(position, depth)[0])
+        seconds += time.perf_counter() - start
+
+    results = {"depth": depth, "searcher_ms": seconds / len(positions) * 1000, "workers": {}}
+    for count in workers:
+        parallel = {piece: ParallelSearcher(weights, piece, count) for piece in (1, 2)}
+        try:
+            # Start the worker processes before timing
+            for piece, searcher in parallel.items():
+                searcher.iterative_deepening(_prepare(position_set, positions[0], weights), 1)
+            seconds = 0.0
+            same = 0
+            for moves, column in zip(positions, columns):
+                position = _prepare(position_set, moves, weights)
+                start = time.perf_counter()
+                chosen = parallel[position.player].iterative_deepening(position, depth)[0]
+                seconds += time.perf_counter() - start
+                same += chosen == column
+        finally:
+            for searcher in parallel.values():
+                searcher.close()
+        ms = seconds / len(positions) * 1000
+        results["workers"][count] = {"ms": ms, "speedup": results["searcher_ms"] / ms, "same": same}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parallel search against Searcher.")
+    parser.add_argument("--sets", nargs="+", help="names of the position sets to run; all by default")
+    parser.add_argument("--positions", default=DEFAULT_SETS, help="position set file")
+    parser.add_argument("--preset", default="connect4", choices=list(WEIGHT_PRESETS))
+    parser.add_argument("--depth", type=int, help="search depth instead of each set's own")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4], help="worker counts to run")
+    args = parser.parse_args()
+
+    sets = load_sets(args.positions)
+    print(f"{'set':12} {'depth':>5} {'workers':>7} {'ms/pos':>9} {'speedup':>7} {'moves':>5}")
+    for name in args.sets or list(sets):
+        position_set = sets[name]
+        result = run(position_set, WEIGHT_PRESETS[args.preset], args.workers, args.depth)
+        print(f"{name:12} {result['depth']:5} {'-':>7} {result['searcher_ms']:9.1f} {1:7.2f} {'-':>5}")
+        for count, row in result["workers"].items():
+            print(f"{'':12} {'':5} {count:7} {row['ms']:9.1f} {row['speedup']:7.2f} "
+                  f"{row['same']:2}/{len(position_set['positions'])}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Benchmark the heuristic search on fixed sets of positions.
+
+The sets in ``benchmarks/positions/search_sets.json`` cover the early,
+middle and end game of the 6x7 board and the early and middle game of a
+9x12 board. Each holds the moves (0-based columns) leading to every
+position and the depth it is searched to.
+
+Every engine searches every position of a set from depth 1 up to the set's
+depth, keeping its tables between depths as iterative deepening does. The
+report gives nodes per second, the mean time to finish each depth, the
+effective branching factor (nodes at the last depth over nodes at the one
+before), and the peak memory allocated while searching, measured with
+tracemalloc in a second, untimed pass.
+
+The ``connect4`` and ``play_with_ai`` engines are the searches behind
+``Connect4.minimax`` and ``PlayWithAI.minimax``. More engines can be added
+to ``ENGINES``.
+
+Save a baseline, then compare a later run against it::
+
+    python benchmarks/search_bench.py --save baseline.json
+    python benchmarks/search_bench.py --compare baseline.json
+
+The comparison exits with status 1 when a result got slower or searched
+more nodes than the threshold allows.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from engine import Position, Searcher, WindowEvaluator
+from engine.evaluation import WEIGHT_PRESETS, mirror_symmetric
+
+DEFAULT_SETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "positions", "search_sets.json")
+
+
+def preset_engine(preset):
+    """Return an engine factory that searches with an evaluation preset."""
+    def make(position):
+        WindowEvaluator(position, *WEIGHT_PRESETS[preset])
+        piece = position.player
+        return Searcher(lambda p: p.evaluator.score(piece), piece,
+                        symmetric=mirror_symmetric(WEIGHT_PRESETS[preset], position.cols))
+    return make
+
+
+# Engine factories: ``make(position)`` prepares ``position`` and returns an
+# object with ``minimax(position, depth)`` and a ``nodes`` count
+ENGINES = {
+    "connect4": preset_engine("connect4"),
+    "play_with_ai": preset_engine("play_with_ai"),
+}
+
+
+def load_sets(path=DEFAULT_SETS):
+    """Read the position sets, keyed by name."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def _prepare(engine, position_set, moves):
+    position = Position.from_moves(moves, position_set["rows"], position_set["cols"],
+                                   connect=position_set["connect"])
+    return position, ENGINES[engine](position)
+
+
+def run(engine, position_set, depth=None, memory=True):
+    """Search every position of a set and return the benchmark results."""
+    depth = depth or position_set["depth"]
+    positions = position_set["positions"]
+    seconds = [0.0] * depth
+    nodes = [0] * depth
+    for moves in positions:
+        position, searcher = _prepare(engine, position_set, moves)
+        for d in range(1, depth + 1):
+            start = time.perf_counter()
+            searcher.minimax(position, d)
+            seconds[d - 1] += time.perf_counter() - start
+            nodes[d - 1] += searcher.nodes
+
+    peak = None
+    if memory:
+        # Tables allocated up front are left out; only the search is traced
+        peak = 0
+        for moves in positions:
+            position, searcher = _prepare(engine, position_set, moves)
+            tracemalloc.start()
+            for d in range(1, depth + 1):
+                searcher.minimax(position, d)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    total_seconds = sum(seconds)
+    time_to_depth = []
+    elapsed = 0.0
+    for d in range(depth):
+        elapsed += seconds[d]
+        time_to_depth.append(elapsed / len(positions) * 1000)
+    return {
+        "engine": engine,
+        "depth": depth,
+        "positions": len(positions),
+        "nodes": sum(nodes),
+        "seconds": total_seconds,
+        "nodes_per_sec": sum(nodes) / total_seconds if total_seconds else None,
+        "nodes_per_depth": nodes,
+        "time_to_depth_ms": time_to_depth,
+        "branching_factor": nodes[-1] / nodes[-2] if depth > 1 and nodes[-2] else None,
+        "peak_memory_kb": None if peak is None else peak / 1024,
+    }
+
+
+def _commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def compare(results, baseline, threshold):
+    """Print how ``results`` changed from ``baseline`` and count the regressions.
+
+    A result regresses when its speed in nodes per second drops, or its
+    node count grows, by more than ``threshold`` percent.
+    """
+    regressions = 0
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None or old["depth"] != result["depth"]:
+            continue
+        speed = (result["nodes_per_sec"] / old["nodes_per_sec"] - 1) * 100
+        nodes = (result["nodes"] / old["nodes"] - 1) * 100
+        slower = speed < -threshold or nodes > threshold
+        regressions += slower
+        print(f"{key:28} nodes/s {speed:+6.1f}%  nodes {nodes:+6.1f}%{'  REGRESSION' if slower else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the search on fixed position sets.")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--sets", nargs="+", help="names of the position sets to run; all by default")
+    parser.add_argument("--positions", default=DEFAULT_SETS, help="position set file")
+    parser.add_argument("--depth", type=int, help="search depth instead of each set's own")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory pass")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare with")
+    parser.add_argument("--threshold", type=float, default=15.0, help="allowed slowdown in percent")
+    args = parser.parse_args()
+
+    sets = load_sets(args.positions)
+    results = {}
+    print(f"{'engine/set':28} {'depth':>5} {'nodes':>9} {'kN/s':>7} {'ms/pos':>9} {'EBF':>5} {'peak KB':>8}")
+    for engine in args.engines:
+        for name in args.sets or list(sets):
+            result = run(engine, sets[name], args.depth, not args.no_memory)
+            result["set"] = name
+            key = f"{engine}/{name}"
+            results[key] = result
+            ebf = "-" if result["branching_factor"] is None else f"{result['branching_factor']:.2f}"
+            peak = "-" if result["peak_memory_kb"] is None else f"{result['peak_memory_kb']:.0f}"
+            print(f"{key:28} {result['depth']:5} {result['nodes']:9} {result['nodes_per_sec'] / 1000:7.1f} "
+                  f"{result['time_to_depth_ms'][-1]:9.1f} {ebf:>5} {peak:>8}", flush=True)
+
+    if args.save:
+        meta = {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with open(args.save, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\ncompared with {args.compare} ({baseline['meta'].get('commit')}):")
+        if compare(results, baseline["results"], args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
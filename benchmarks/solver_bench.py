@@ -0,0 +1,81 @@
+"""Benchmark the 6x7 solver on sets of test positions.
+
+Each line of a position file holds a position, written as the 1-based
+columns played from the empty board, and its expected score, e.g.
+``4453 -2``. This is the format of the widely used test sets by Pascal
+Pons (Test_L3_R1 for end-easy, ...), which can be passed in directly.
+
+    python benchmarks/solver_bench.py benchmarks/positions/end_easy.txt
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from engine import Position
+from engine.solver import Solver
+
+
+def load_positions(path):
+    """Read ``(moves, expected_score)`` pairs from a position file."""
+    positions = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                moves, score = line.split()
+                positions.append(([int(c) - 1 for c in moves], int(score)))
+    return positions
+
+
+def run(path, weak=False, limit=None, reset=True):
+    """Solve every position of ``path`` and return the benchmark results."""
+    positions = load_positions(path)[:limit]
+    solver = Solver()
+    times = []
+    nodes = 0
+    errors = 0
+    for moves, expected in positions:
+        if reset:
+            solver.reset()
+        position = Position.from_moves(moves)
+        start = time.perf_counter()
+        score = solver.solve(position, weak=weak)
+        times.append(time.perf_counter() - start)
+        nodes += solver.nodes
+        if weak:
+            expected = (expected > 0) - (expected < 0)
+        if score != expected:
+            errors += 1
+    total = sum(times)
+    return {
+        "file": path,
+        "positions": len(positions),
+        "errors": errors,
+        "mean_time_ms": 1000 * total / len(positions),
+        "mean_nodes": nodes / len(positions),
+        "positions_per_second": len(positions) / total if total else float("inf"),
+        "nodes_per_second": nodes / total if total else float("inf"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", nargs="+", help="position files to solve")
+    parser.add_argument("--weak", action="store_true", help="only solve for win/draw/loss")
+    parser.add_argument("--limit", type=int, help="solve only the first N positions of each file")
+    parser.add_argument("--keep-table", action="store_true",
+                        help="keep the transposition table between positions")
+    args = parser.parse_args()
+
+    print(f"{'file':<40} {'positions':>9} {'errors':>6} {'mean ms':>10} {'mean nodes':>11} "
+          f"{'pos/s':>9} {'nodes/s':>10}")
+    for path in args.files:
+        r = run(path, args.weak, args.limit, reset=not args.keep_table)
+        print(f"{r['file']:<40} {r['positions']:>9} {r['errors']:>6} {r['mean_time_ms']:>10.2f} "
+              f"{r['mean_nodes']:>11.0f} {r['positions_per_second']:>9.1f} {r['nodes_per_second']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+from .evaluation import CONNECT4_WEIGHTS, PLAY_WITH_AI_WEIGHTS, WindowEvaluator
+from .geometry import Geometry, geometry
+from .ordering import MoveOrdering
+from .player import AIPlayer, best_move
+from .position import Position
+from .search import Searcher, SearchTimeout, WIN_SCORE
+from .stats import SearchStats
+from .transposition import TranspositionTable
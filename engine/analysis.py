@@ -0,0 +1,211 @@
+"""Analyse recorded games move by move.
+
+Reads games as move strings, one per line, from a file or standard input,
+and streams one JSON line per move::
+
+    python -m engine.analysis games.txt --depth 8 --workers 4 > analysis.jsonl
+
+A game is written as the 1-based columns played from the empty board, as
+in ``4453``; on boards wider than 9 columns the columns are separated by
+commas, as in ``10,11,3``. Anything after ``#`` or after the first space is
+ignored, so the text game records of ``engine.records`` and the position
+files of ``benchmarks/solver_bench.py`` can be read directly.
+
+For every move the engine searches the position before it and reports its
+best move and value, then searches the position after the played move to
+the same depth. Both values are from the mover's point of view, so their
+difference is what the move lost; a move losing at least the blunder
+threshold is flagged. A forced win or loss is reported as plus or minus
+``WIN_SCORE`` however many moves away it is, so that two winning moves
+score the same whichever depth found them. A game that cannot be
+replayed gives a single line with an ``error``.
+
+Games are analysed in a process pool with a bounded number in flight and
+written in input order as each finishes, so memory stays constant however
+long the input is.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .evaluation import WEIGHT_PRESETS, WindowEvaluator, mirror_symmetric
+from .position import Position
+from .records import parse_moves
+from .search import Searcher, WIN_SCORE
+
+# Games queued per worker ahead of the one being written
+_QUEUED_PER_WORKER = 4
+
+
+def analyse_game(index, moves, depth=6, preset="connect4", time_budget_ms=None, blunder=200,
+                 rows=6, cols=7, connect=4):
+    """Analyse every move of one game.
+
+    Args:
+        index (int): Game number, copied into the records.
+        moves (list): The game's 0-based columns.
+        depth (int): Search depth, or the deepest iteration with a time budget.
+        preset (str): Evaluation preset, a key of ``WEIGHT_PRESETS``.
+        time_budget_ms (float): Time to search each position before a move,
+            or None to always search to ``depth``.
+        blunder (int): Loss in evaluation from which a move is a blunder.
+
+    Returns:
+        list: One dict per move, with ``ply``, ``player``, ``move``,
+        ``best``, ``eval`` (the best move's value), ``played_eval``,
+        ``loss``, ``blunder`` and ``depth``, or a single dict with an
+        ``error`` if the game cannot be replayed.
+    """
+    position = Position(rows, cols, connect=connect)
+    WindowEvaluator(position, *WEIGHT_PRESETS[preset])
+    # One searcher per side, each scoring for the player it analyses
+    symmetric = mirror_symmetric(WEIGHT_PRESETS[preset], cols)
+    searchers = {piece: Searcher(lambda p, piece=piece: p.evaluator.score(piece), piece, symmetric=symmetric)
+                 for piece in (1, 2)}
+    records = []
+    for ply, col in enumerate(moves):
+        if position.winner or not 0 <= col < cols or not position.can_play(col):
+            return [{"game": index, "ply": ply, "error": f"illegal move {col + 1} at ply {ply}"}]
+        player = position.player
+        searcher = searchers[player]
+        best, value, searched = searcher.iterative_deepening(position, depth, time_budget_ms)
+        position.play(col)
+        if col == best:
+            played = value
+        else:
+            # The reply is searched to the depth the best move's reply was,
+            # or as deep as allowed when the search stopped at a forced result
+            reply_depth = depth - 1 if abs(value) >= WIN_SCORE else searched - 1
+            played = searcher.minimax(position, max(reply_depth, 0), maximizing=False)[1]
+        value, played = _forced(value), _forced(played)
+        loss = max(value - played, 0)
+        records.append({
+            "game": index,
+            "ply": ply,
+            "player": player,
+            "move": col + 1,
+            "best": best + 1,
+            "eval": value,
+            "played_eval": played,
+            "loss": loss,
+            "blunder": loss >= blunder,
+            "depth": searched,
+        })
+    return records
+
+
+def _forced(value):
+    # The search scores a win as WIN_SCORE plus the depth left when it is
+    # reached, which depends on how deep the search was asked to go
+    if value >= WIN_SCORE:
+        return WIN_SCORE
+    if value <= -WIN_SCORE:
+        return -WIN_SCORE
+    return value
+
+
+def read_games(lines, cols=7):
+    """Yield ``(index, moves_or_error)`` for every game among ``lines``.
+
+    Blank and comment lines are skipped without taking a game number. A
+    malformed line yields its ``ValueError`` in place of the moves.
+    """
+    index = 0
+    for line in lines:
+        try:
+            moves = parse_moves(line, cols)
+        except ValueError as error:
+            moves = error
+        if moves is not None:
+            yield index, moves
+            index += 1
+
+
+def analyse(lines, output, workers=1, **options):
+    """Analyse the games in ``lines`` and write JSON lines to ``output``.
+
+    Args:
+        lines (iterable): Move strings; read lazily.
+        output (file): Text file to write to, flushed after every game.
+        workers (int): Processes to analyse games in; 1 analyses them in
+            this process.
+        **options: Passed on to ``analyse_game``.
+
+    Returns:
+        tuple: ``(games, blunders)`` counts.
+    """
+    games = blunders = 0
+
+    def write(records):
+        nonlocal games, blunders
+        games += 1
+        for record in records:
+            blunders += record.get("blunder", False)
+            output.write(json.dumps(record) + "\n")
+        output.flush()
+
+    if workers > 1:
+        # A bounded queue of pending games, written in input order as soon
+        # as the oldest is done
+        limit = workers * _QUEUED_PER_WORKER
+        pending = deque()
+        with ProcessPoolExecutor(workers) as executor:
+            for index, moves in read_games(lines, options.get("cols", 7)):
+                if isinstance(moves, ValueError):
+                    pending.append([{"game": index, "error": str(moves)}])
+                else:
+                    pending.append(executor.submit(analyse_game, index, moves, **options))
+                while pending and (len(pending) > limit or _done(pending[0])):
+                    write(_result(pending.popleft()))
+            while pending:
+                write(_result(pending.popleft()))
+    else:
+        for index, moves in read_games(lines, options.get("cols", 7)):
+            if isinstance(moves, ValueError):
+                write([{"game": index, "error": str(moves)}])
+            else:
+                write(analyse_game(index, moves, **options))
+    return games, blunders
+
+
+def _done(entry):
+    return isinstance(entry, list) or entry.done()
+
+
+def _result(entry):
+    return entry if isinstance(entry, list) else entry.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse recorded Connect 4 games move by move.")
+    parser.add_argument("input", nargs="?", help="file of move strings, one game per line; standard input by default")
+    parser.add_argument("--output", help="JSONL file to write; standard output by default")
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--time-ms", type=float, help="time to search each position, up to --depth")
+    parser.add_argument("--preset", default="connect4", choices=list(WEIGHT_PRESETS))
+    parser.add_argument("--blunder", type=int, default=200, help="evaluation loss that makes a move a blunder")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=7)
+    parser.add_argument("--connect", type=int, default=4)
+    args = parser.parse_args()
+
+    lines = open(args.input) if args.input else sys.stdin
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        games, blunders = analyse(lines, output, args.workers, depth=args.depth, preset=args.preset,
+                                  time_budget_ms=args.time_ms, blunder=args.blunder,
+                                  rows=args.rows, cols=args.cols, connect=args.connect)
+    finally:
+        if args.input:
+            lines.close()
+        if args.output:
+            output.close()
+    print(f"{games} games, {blunders} blunders", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
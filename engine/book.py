@@ -0,0 +1,211 @@
+"""Opening book: precomputed best moves for the first plies of the game.
+
+Build a book offline, then look moves up at play time::
+
+    python -m engine.book books/opening_6x7.bin --plies 4 --depth 8
+
+The file holds a small header followed by fixed-size records sorted by
+position key, so a lookup is a binary search over a memory-mapped file:
+opening it costs nothing, and processes that open the same book share its
+pages through the operating system's cache.
+
+Books of version 2 store a position and its mirror image once, under
+``Position.canonical_key`` and with the column as played in that
+orientation, which halves their size. They are built so whenever the
+scores are the same for mirror images: always with the solver, and with the
+heuristic search when its weights are ``mirror_symmetric``. Version 1 books
+store every position under its own key.
+"""
+import argparse
+import mmap
+import struct
+import time
+
+from .evaluation import CONNECT4_WEIGHTS, WindowEvaluator, mirror_symmetric
+from .position import Position
+from .search import Searcher, SearchTimeout
+from .solver import Solver
+
+MAGIC = b"C4BK"
+# Magic, version, rows, cols, connect, kind, record count
+_HEADER = struct.Struct("<4sBBBBBxxxQ")
+# Position key, score for the player to move, best column
+_RECORD = struct.Struct("<QqB")
+
+HEURISTIC, SOLVED = 0, 1
+
+
+class OpeningBook:
+    """Read-only view of an opening book file.
+
+    Attributes:
+        rows (int): Number of rows of the book's board.
+        cols (int): Number of columns of the book's board.
+        connect (int): Number of aligned discs needed to win.
+        kind (int): ``HEURISTIC`` if scores come from the depth-limited
+            search, ``SOLVED`` if they are exact solver scores.
+        count (int): Number of positions in the book.
+        canonical (bool): True if positions are stored under their
+            canonical key, so mirror images share an entry.
+    """
+
+    def __init__(self, path):
+        """Open and memory-map the book at ``path``."""
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.rows, self.cols, self.connect, self.kind, self.count = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version not in (1, 2):
+            self.close()
+            raise ValueError(f"{path} is not an opening book")
+        self.canonical = version == 2
+
+    def lookup(self, position):
+        """Return the book entry for ``position``.
+
+        Returns:
+            tuple: ``(column, score)`` with the score for the player to move,
+            or None if the position is not in the book.
+        """
+        if (position.rows, position.cols, position.geometry.connect) != (self.rows, self.cols, self.connect):
+            return None
+        key = position.key()
+        mirrored = False
+        if self.canonical:
+            mirror_key = position.mirror_key()
+            if mirror_key < key:
+                key, mirrored = mirror_key, True
+        data = self._map
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            record_key, score, column = _RECORD.unpack_from(data, _HEADER.size + mid * _RECORD.size)
+            if record_key < key:
+                low = mid + 1
+            elif record_key > key:
+                high = mid
+            else:
+                return (self.cols - 1 - column if mirrored else column), score
+        return None
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """Release the memory map and the file."""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def book_positions(plies, rows=6, cols=7, connect=4, canonical=False):
+    """Yield every distinct position with at most ``plies`` discs and no winner.
+
+    Positions are told apart by ``Position.key``, so each one is produced
+    once however many move orders reach it; with ``canonical``, by
+    ``Position.canonical_key``, so only one of a position and its mirror
+    image is.
+    """
+    frontier = [Position(rows, cols, connect=connect)]
+    seen = set()
+    for ply in range(plies + 1):
+        next_frontier = []
+        for position in frontier:
+            yield position
+            if ply == plies:
+                continue
+            for col in position.legal_moves():
+                child = position.copy()
+                child.play(col)
+                key = child.canonical_key() if canonical else child.key()
+                if child.winner or key in seen:
+                    continue
+                seen.add(key)
+                next_frontier.append(child)
+        frontier = next_frontier
+
+
+def build_book(path, plies, depth=8, rows=6, cols=7, connect=4, solve=False,
+               time_budget_ms=None, progress=None):
+    """Compute the best move of every early position and write a book file.
+
+    Args:
+        path (str): File to write.
+        plies (int): Book positions with up to this many discs.
+        depth (int): Search depth of the heuristic search.
+        solve (bool): Use the exact solver (6x7 only) instead of the search;
+            positions it cannot solve within ``time_budget_ms`` are left out.
+        time_budget_ms (float): Per-position limit, or None.
+        progress (callable): Called as ``progress(done, total)`` now and then.
+
+    Returns:
+        int: Number of positions written.
+    """
+    if cols * (rows + 1) > 64:
+        raise ValueError("position keys of this board do not fit in 64 bits")
+    canonical = solve or mirror_symmetric(CONNECT4_WEIGHTS, cols)
+    positions = list(book_positions(plies, rows, cols, connect, canonical))
+    solver = Solver() if solve else None
+    # One searcher per side, so that each reuses its transposition table
+    symmetric = mirror_symmetric(CONNECT4_WEIGHTS, cols)
+    searchers = {
+        piece: Searcher(lambda p, piece=piece: p.evaluator.score(piece), piece, symmetric=symmetric)
+        for piece in (1, 2)
+    }
+    records = []
+    for done, position in enumerate(positions, 1):
+        if solver is not None:
+            try:
+                column, score = solver.best_move(position, time_budget_ms)
+            except SearchTimeout:
+                continue
+        else:
+            position = position.copy()
+            WindowEvaluator(position, *CONNECT4_WEIGHTS)
+            column, score, _ = searchers[position.player].iterative_deepening(position, depth, time_budget_ms)
+        key = position.key()
+        if canonical and position.mirror_key() < key:
+            key, column = position.mirror_key(), cols - 1 - column
+        records.append((key, score, column))
+        if progress is not None:
+            progress(done, len(positions))
+
+    records.sort()
+    with open(path, "wb") as f:
+        version = 2 if canonical else 1
+        f.write(_HEADER.pack(MAGIC, version, rows, cols, connect, SOLVED if solve else HEURISTIC, len(records)))
+        for record in records:
+            f.write(_RECORD.pack(*record))
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a Connect 4 opening book.")
+    parser.add_argument("path", help="book file to write")
+    parser.add_argument("--plies", type=int, default=4, help="book positions with up to this many discs")
+    parser.add_argument("--depth", type=int, default=8, help="heuristic search depth")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=7)
+    parser.add_argument("--connect", type=int, default=4)
+    parser.add_argument("--solve", action="store_true", help="store exact solver scores (6x7 only)")
+    parser.add_argument("--time-budget-ms", type=float, help="limit per position")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def progress(done, total):
+        if done % 100 == 0 or done == total:
+            print(f"{done}/{total} positions, {time.perf_counter() - start:.0f}s", flush=True)
+
+    count = build_book(args.path, args.plies, args.depth, args.rows, args.cols, args.connect,
+                       args.solve, args.time_budget_ms, progress)
+    print(f"wrote {count} positions to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
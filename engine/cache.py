@@ -0,0 +1,229 @@
+"""Caches of search results shared by every player in a process, or across processes.
+
+A player searching a position it, or another player with the same
+evaluation, has already searched to the same depth can reuse the answer.
+This happens when "play again" starts another game through the same early
+positions, and when many sessions of a server meet the same openings.
+Entries are keyed by ``cache_key``, which combines the position's Zobrist
+hash with the board geometry, the evaluation weights and the piece
+searched for, so players that would score a position differently never
+share an entry. When the weights score mirror images alike, a position
+and its mirror image share one entry, stored with the column as played in
+the orientation of ``Position.canonical_hash``; ``cache_column`` converts.
+
+``ResultCache`` keeps the most recently used entries of one process.
+``SharedResultCache`` puts a fixed-size table in shared memory that
+processes attach to by name, so the workers of a pool reuse each other's
+searches.
+
+Leaf evaluations are not cached: ``WindowEvaluator`` keeps the score up to
+date as discs are played, so reading it is cheaper than any lookup.
+"""
+import struct
+import threading
+from collections import OrderedDict
+
+from .evaluation import mirror_symmetric
+
+_MASK_64 = (1 << 64) - 1
+
+
+def cache_key(position, weights, piece):
+    """Return the 64-bit cache key of ``position`` searched for ``piece`` with ``weights``."""
+    config = hash((weights, piece, position.rows, position.cols, position.geometry.connect))
+    position_hash = position.canonical_hash() if mirror_symmetric(weights, position.cols) else position.hash
+    return (position_hash ^ config * 0x9E3779B97F4A7C15) & _MASK_64
+
+
+def cache_column(position, weights, column):
+    """Convert ``column`` between ``position`` and its entry under ``cache_key``.
+
+    The conversion is its own inverse, so it serves both to store a column
+    and to read one back. None stays None.
+    """
+    if column is not None and mirror_symmetric(weights, position.cols) and position.is_mirrored():
+        return position.cols - 1 - column
+    return column
+
+
+class ResultCache:
+    """Size-bounded cache of search results with least-recently-used eviction.
+
+    Safe to share between threads, e.g. a UI's search thread and its
+    pondering.
+
+    Attributes:
+        capacity (int): Most entries kept.
+        hits (int): Lookups that found an entry.
+        misses (int): Lookups that did not.
+        evictions (int): Entries dropped to make room.
+    """
+
+    def __init__(self, capacity=1 << 16):
+        """Initialize the ResultCache class."""
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return ``(depth, column, value)`` stored for ``key``, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, depth, column, value):
+        """Store a search result, unless a deeper one is already stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > depth:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = (depth, column, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """Return the counters as a dict of plain values."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        """Drop every entry; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Check word, data word
+_SLOT = struct.Struct("<QQ")
+_VALUE_BIAS = 1 << 47
+
+
+class SharedResultCache:
+    """Search result cache in shared memory, for a pool of worker processes.
+
+    One process creates the cache, the others attach to it by ``name``.
+    Slots are direct-mapped by key and written without locks: each holds
+    the result packed into a data word and the key XOR the data word, so a
+    slot torn by two processes writing at once fails its check and reads
+    as a miss. A new result replaces the slot's old one, unless the slot
+    holds a deeper result for the same key. Eviction is therefore by slot
+    rather than least-recently-used. Counters count this process's lookups.
+
+    Attributes:
+        name (str): Name of the shared memory block.
+        capacity (int): Number of slots, a power of two.
+        hits (int): Lookups that found an entry.
+        misses (int): Lookups that did not.
+        evictions (int): Entries overwritten by a different key.
+    """
+
+    def __init__(self, capacity=1 << 16, name=None, create=True):
+        """Create a cache, or attach to the one called ``name`` with ``create=False``.
+
+        Args:
+            capacity (int): Slots, rounded up to a power of two; the same
+                number the cache was created with when attaching.
+            name (str): Name of the shared memory block; chosen by the
+                system when None and creating.
+            create (bool): Create the block rather than attach to it.
+        """
+        # Imported here as multiprocessing is slow to load and rarely needed
+        from multiprocessing import shared_memory
+
+        capacity = 1 << max(0, capacity - 1).bit_length()
+        if create:
+            self._memory = shared_memory.SharedMemory(name, create=True, size=capacity * _SLOT.size)
+            self._memory.buf[:capacity * _SLOT.size] = bytes(capacity * _SLOT.size)
+        else:
+            self._memory = shared_memory.SharedMemory(name)
+        self.name = self._memory.name
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._mask = capacity - 1
+        self._owner = create
+
+    @classmethod
+    def attach(cls, name, capacity):
+        """Attach to the cache of ``capacity`` slots another process created as ``name``."""
+        return cls(capacity, name, create=False)
+
+    def get(self, key):
+        """Return ``(depth, column, value)`` stored for ``key``, or None."""
+        check, data = _SLOT.unpack_from(self._memory.buf, (key & self._mask) * _SLOT.size)
+        if data == 0 or check ^ data != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        column = (data >> 56) - 1
+        return data >> 48 & 255, None if column < 0 else column, (data & (_VALUE_BIAS * 2 - 1)) - _VALUE_BIAS
+
+    def put(self, key, depth, column, value):
+        """Store a search result, unless the slot has a deeper one for ``key``."""
+        offset = (key & self._mask) * _SLOT.size
+        buf = self._memory.buf
+        check, data = _SLOT.unpack_from(buf, offset)
+        if data:
+            if check ^ data == key:
+                if data >> 48 & 255 > depth:
+                    return
+            else:
+                self.evictions += 1
+        column = -1 if column is None else column
+        value = max(-_VALUE_BIAS, min(_VALUE_BIAS - 1, int(value)))
+        data = (value + _VALUE_BIAS) | min(depth, 255) << 48 | (column + 1) << 56
+        _SLOT.pack_into(buf, offset, key ^ data, data)
+
+    def stats(self):
+        """Return the counters as a dict of plain values."""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        """Empty every slot, for every attached process."""
+        self._memory.buf[:self.capacity * _SLOT.size] = bytes(self.capacity * _SLOT.size)
+
+    def close(self):
+        """Detach from the cache; the process that created it also frees it."""
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+_process_cache = None
+
+
+def process_cache():
+    """Return the ``ResultCache`` shared by everything in this process."""
+    global _process_cache
+    if _process_cache is None:
+        _process_cache = ResultCache()
+    return _process_cache
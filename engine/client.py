@@ -0,0 +1,157 @@
+"""Client of the game server, and a load test that plays many games at once.
+
+``GameClient`` speaks the line-delimited JSON protocol of
+``engine.server``. Run as a module, it opens ``--sessions`` connections,
+plays a random game against the AI on each, and reports how long the AI
+took to answer::
+
+    python -m engine.client --sessions 1000 --port 8765
+    python -m engine.client --sessions 200 --local --workers 2
+
+With ``--local`` the server runs in the same process on a free port, so no
+separate server is needed.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from .server import GameServer
+
+
+class GameClient:
+    """One session with a game server."""
+
+    def __init__(self, reader, writer):
+        """Initialize the GameClient class; see ``connect``."""
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765):
+        """Open a session with the server at ``host``:``port``."""
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, op, **fields):
+        """Send one request and return the server's reply.
+
+        Raises:
+            ConnectionError: If the server closed the connection.
+        """
+        self.writer.write(json.dumps({"op": op, **fields}).encode() + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("the server closed the connection")
+        return json.loads(line)
+
+    async def close(self):
+        """End the session."""
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def play_random_game(host, port, rng, latencies, **options):
+    """Play a game of random moves against the AI and time its replies.
+
+    A ``busy`` reply is retried with an ``ai`` request after a short pause.
+
+    Returns:
+        dict: The final reply, or the error reply that ended the game.
+    """
+    client = await GameClient.connect(host, port)
+    try:
+        start = time.perf_counter()
+        reply = await client.request("new", ai_first=rng.random() < 0.5, **options)
+        busy = 0
+        while True:
+            if reply.get("error") == "busy":
+                busy += 1
+                await asyncio.sleep(0.05 * busy)
+                start = time.perf_counter()
+                reply = await client.request("ai")
+                continue
+            if "ai_move" in reply:
+                latencies.append(time.perf_counter() - start)
+            if not reply["ok"] or reply["over"]:
+                return {**reply, "busy": busy}
+            rows = options.get("rows", 6)
+            heights = [0] * options.get("cols", 7)
+            for col in reply["moves"]:
+                heights[col] += 1
+            column = rng.choice([c for c, h in enumerate(heights) if h < rows])
+            start = time.perf_counter()
+            reply = await client.request("move", column=column)
+    finally:
+        await client.close()
+
+
+async def load_test(sessions, host="127.0.0.1", port=8765, seed=None, local=False, workers=None, **options):
+    """Play ``sessions`` games at once and summarize the AI's reply times.
+
+    Returns:
+        dict: Games, moves, busy retries and reply time percentiles in ms.
+    """
+    server = None
+    if local:
+        server = GameServer(workers=workers, max_sessions=sessions)
+        listener = await server.start(host, 0)
+        port = listener.sockets[0].getsockname()[1]
+    try:
+        rng = random.Random(seed)
+        latencies = []
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            play_random_game(host, port, random.Random(rng.random()), latencies, **options)
+            for _ in range(sessions)
+        ))
+        elapsed = time.perf_counter() - start
+        if server is not None:
+            stats = server.stats()
+        else:
+            client = await GameClient.connect(host, port)
+            stats = await client.request("stats")
+            await client.close()
+    finally:
+        if server is not None:
+            await server.close()
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000 if latencies else None
+
+    return {
+        "games": sum(1 for result in results if result["ok"]),
+        "errors": sum(1 for result in results if not result["ok"]),
+        "ai_moves": len(latencies),
+        "busy_retries": sum(result["busy"] for result in results),
+        "seconds": elapsed,
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "max_ms": percentile(100),
+        "server": stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Connect 4 game server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=100, help="games played at the same time")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--time-ms", type=float, default=200)
+    parser.add_argument("--preset", default="connect4")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--local", action="store_true", help="run the server in this process")
+    parser.add_argument("--workers", type=int, help="search processes of the --local server")
+    args = parser.parse_args()
+    summary = asyncio.run(load_test(args.sessions, args.host, args.port, args.seed, args.local, args.workers,
+                                    depth=args.depth, time_ms=args.time_ms, preset=args.preset))
+    print(json.dumps(summary, indent=1))
+
+
+if __name__ == "__main__":
+    main()
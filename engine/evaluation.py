@@ -0,0 +1,119 @@
+# Window weights of the two AIs, as ``(weights, opponent_weights,
+# centre_weight)`` arguments for ``WindowEvaluator``: the pygame Connect4
+# class and the Tkinter PlayWithAI class
+CONNECT4_WEIGHTS = ((0, 0, 2, 5, 100), (0, 0, 0, -4, 0), 3)
+PLAY_WITH_AI_WEIGHTS = ((0, 0, 10, 100, 10000), (0, 0, -10, -100, 0), 0)
+
+# The presets by name, for command-line tools
+WEIGHT_PRESETS = {"connect4": CONNECT4_WEIGHTS, "play_with_ai": PLAY_WITH_AI_WEIGHTS}
+
+
+def window_values(weights, opponent_weights, connect=4):
+    """Return the value of every possible window for each player.
+
+    A window's disc counts are packed as ``count1 + (connect + 1) * count2``
+    where ``count1`` and ``count2`` are the numbers of discs of pieces 1 and
+    2 in it; the returned lists are indexed by that code.
+
+    Returns:
+        tuple: ``(values1, values2)``, the window values for pieces 1 and 2.
+    """
+    base = connect + 1
+    values1 = [weights[c1] if not c2 else opponent_weights[c2] if not c1 else 0
+               for c2 in range(base) for c1 in range(base)]
+    values2 = [weights[c2] if not c1 else opponent_weights[c1] if not c2 else 0
+               for c2 in range(base) for c1 in range(base)]
+    return values1, values2
+
+
+def mirror_symmetric(weights, cols):
+    """Return True if ``weights`` score every position like its mirror image.
+
+    The windows of a board mirror each other, but on an even number of
+    columns the centre column, ``cols // 2``, is right of the middle, so a
+    centre weight makes the evaluation lopsided.
+
+    Args:
+        weights (tuple): ``(weights, opponent_weights, centre_weight)``.
+        cols (int): Number of columns of the board.
+    """
+    return cols % 2 == 1 or not weights[2]
+
+
+class WindowEvaluator:
+    """Incrementally maintained window-counting evaluation of a position.
+
+    The heuristic scores every winning line (a window) by how many
+    discs each player has in it: a window holding only a player's discs is
+    worth ``weights[count]`` to that player and ``opponent_weights[count]``
+    to the other one, and a window holding both colours is dead and worth
+    nothing. Each disc in the centre column is also worth ``centre_weight``
+    to its owner.
+
+    Instead of rescanning the board, the evaluator is attached to a
+    ``Position`` and is told about every ``play`` and ``undo``. It keeps the
+    disc counts of each window packed in one integer and a running score for
+    both players, so a move only touches the windows through the dropped
+    disc and reading the score is free.
+
+    Attributes:
+        scores (list): Current score of the position for each piece;
+            ``scores[piece - 1]``.
+        symmetric (bool): True if a position and its mirror image get the
+            same scores; see ``mirror_symmetric``.
+    """
+
+    def __init__(self, position, weights, opponent_weights, centre_weight=0):
+        """Attach a new evaluator to ``position``.
+
+        Any evaluator previously attached to the position is replaced.
+
+        Args:
+            position (Position): Position to evaluate and follow.
+            weights (tuple): Value of a window with ``i`` of the player's own
+                discs and none of the opponent's, indexed by ``i``.
+            opponent_weights (tuple): Value of a window with ``i`` opponent
+                discs and none of the player's own, indexed by ``i``.
+            centre_weight (int): Value of each own disc in the centre column.
+        """
+        geometry = position.geometry
+        self._through = geometry.lines_through
+        self._centre = geometry.in_centre
+        self._deltas = (1, geometry.connect + 1)
+        self._values = window_values(weights, opponent_weights, geometry.connect)
+        self._centre_weight = centre_weight
+        self.symmetric = mirror_symmetric((weights, opponent_weights, centre_weight), position.cols)
+
+        windows = len(geometry.lines)
+        self._codes = [0] * windows
+        self.scores = [self._values[0][0] * windows, self._values[1][0] * windows]
+        for c in range(position.cols):
+            for r in range(position.heights[c]):
+                self.played(c * position.height + r, position.cell(r, c))
+        position.evaluator = self
+
+    def score(self, piece):
+        """Return the score of the current position for ``piece``."""
+        return self.scores[piece - 1]
+
+    def played(self, index, piece):
+        """Update the counts after ``piece`` was dropped on bitboard bit ``index``."""
+        self._update(index, piece, self._deltas[piece - 1])
+
+    def undone(self, index, piece):
+        """Update the counts after ``piece`` was removed from bitboard bit ``index``."""
+        self._update(index, piece, -self._deltas[piece - 1])
+
+    def _update(self, index, piece, delta):
+        codes = self._codes
+        values1, values2 = self._values
+        change1 = change2 = 0
+        for w in self._through[index]:
+            old = codes[w]
+            new = codes[w] = old + delta
+            change1 += values1[new] - values1[old]
+            change2 += values2[new] - values2[old]
+        self.scores[0] += change1
+        self.scores[1] += change2
+        if self._centre[index]:
+            self.scores[piece - 1] += self._centre_weight if delta > 0 else -self._centre_weight
@@ -0,0 +1,140 @@
+import random
+from functools import lru_cache
+
+
+class Geometry:
+    """Tables derived from a board's shape, shared by every position on it.
+
+    Cells are numbered like ``Position`` bitboard bits: the cell ``row`` rows
+    up from the bottom of ``col`` is index ``col * (rows + 1) + row``. The
+    spare index on top of each column belongs to no cell and to no line.
+    Build instances through ``geometry()`` so that each shape is only set up
+    once.
+
+    Attributes:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        connect (int): Number of aligned discs needed to win.
+        height (int): Bits per column, ``rows + 1``.
+        size (int): Number of bit indexes, ``cols * height``.
+        lines (tuple): Every winning line, as a tuple of ``connect`` cell indexes.
+        lines_through (tuple): For each cell index, the numbers of the lines
+            through that cell.
+        flat_lines (tuple): ``lines`` with cells numbered ``row * cols + col``,
+            matching a ``(rows, cols)`` array.
+        shifts (tuple): Bit shifts that step one cell vertically,
+            horizontally and along both diagonals.
+        centre_col (int): Index of the centre column.
+        centre_weights (tuple): Per column, larger the closer it is to the centre.
+        centre_order (tuple): Columns sorted centre first.
+        in_centre (tuple): Per cell index, True if it lies in the centre column.
+        piece_keys (tuple): Zobrist keys; ``piece_keys[piece - 1][index]``.
+        mirror_piece_keys (tuple): ``piece_keys`` of the cell mirrored left to
+            right, which hash a position as its mirror image would be.
+        side_key (int): Zobrist key of the second player being to move.
+        column_mask (int): Bitboard of the bits of the first column.
+    """
+
+    def __init__(self, rows, cols, connect=4):
+        """Initialize the Geometry class.
+
+        Args:
+            rows (int): Number of rows.
+            cols (int): Number of columns.
+            connect (int): Number of aligned discs needed to win.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+        self.height = height = rows + 1
+        self.size = cols * height
+
+        lines = []
+        flat_lines = []
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+            for r in range(rows):
+                for c in range(cols):
+                    end_r, end_c = r + dr * (connect - 1), c + dc * (connect - 1)
+                    if 0 <= end_r < rows and end_c < cols:
+                        cells = [(r + dr * i, c + dc * i) for i in range(connect)]
+                        lines.append(tuple(col * height + row for row, col in cells))
+                        flat_lines.append(tuple(row * cols + col for row, col in cells))
+        self.lines = tuple(lines)
+        self.flat_lines = tuple(flat_lines)
+        through = [[] for _ in range(self.size)]
+        for number, line in enumerate(lines):
+            for index in line:
+                through[index].append(number)
+        self.lines_through = tuple(tuple(numbers) for numbers in through)
+        self.shifts = (1, height, height + 1, height - 1)
+        # Shift amounts that grow single discs into runs of ``connect``: runs
+        # double in length at each step, and the last step tops them up
+        lengths = []
+        length = 1
+        while length * 2 <= connect:
+            lengths.append(length)
+            length *= 2
+        if length < connect:
+            lengths.append(connect - length)
+        self._run_steps = tuple(tuple(n * shift for n in lengths) for shift in self.shifts)
+        if len(lengths) == 2:
+            # Connect 3 and 4: unrolled, without the loops' iterators
+            self.connects = _two_step_connects(self._run_steps)
+
+        self.centre_col = cols // 2
+        self.centre_weights = tuple(cols - abs(2 * c - (cols - 1)) for c in range(cols))
+        self.centre_order = tuple(sorted(range(cols), key=lambda c: -self.centre_weights[c]))
+        self.in_centre = tuple(index // height == self.centre_col for index in range(self.size))
+
+        # A fixed seed makes hashes agree between processes, so workers can
+        # share transposition tables and opening books
+        rng = random.Random(rows * 1000 + cols)
+        self.piece_keys = tuple(tuple(rng.getrandbits(64) for _ in range(self.size)) for _ in range(2))
+        self.side_key = rng.getrandbits(64)
+        mirrored = [(cols - 1 - index // height) * height + index % height for index in range(self.size)]
+        self.mirror_piece_keys = tuple(tuple(keys[m] for m in mirrored) for keys in self.piece_keys)
+        self.column_mask = (1 << height) - 1
+
+    def connects(self, board):
+        """Return True if the bitboard ``board`` holds ``connect`` aligned discs.
+
+        Each direction is checked with shift-and-mask steps: ANDing a board
+        of runs of ``n`` discs with itself shifted by ``k <= n`` cells leaves
+        the starts of runs of ``n + k`` discs. The spare bit on top of every
+        column stops vertical and diagonal runs from wrapping into the next
+        column.
+        """
+        for steps in self._run_steps:
+            m = board
+            for step in steps:
+                m &= m >> step
+            if m:
+                return True
+        return False
+
+
+def _two_step_connects(run_steps):
+    """Return ``Geometry.connects`` for runs grown in two steps per direction."""
+    (a1, a2), (b1, b2), (c1, c2), (d1, d2) = run_steps
+
+    def connects(board):
+        m = board & board >> a1
+        if m & m >> a2:
+            return True
+        m = board & board >> b1
+        if m & m >> b2:
+            return True
+        m = board & board >> c1
+        if m & m >> c2:
+            return True
+        m = board & board >> d1
+        return m & m >> d2 != 0
+
+    connects.__doc__ = Geometry.connects.__doc__
+    return connects
+
+
+@lru_cache(maxsize=None)
+def geometry(rows, cols, connect=4):
+    """Return the shared ``Geometry`` for a board shape, building it on first use."""
+    return Geometry(rows, cols, connect)
@@ -0,0 +1,109 @@
+class MoveOrdering:
+    """Decides the order in which the search tries the moves of a node.
+
+    Alpha-beta prunes the most when the best move is searched first. Moves
+    are ranked by, in order of priority:
+
+    * the best move remembered in the transposition table,
+    * the killer moves of the current ply, i.e. the last moves that caused
+      a beta cutoff in a sibling node,
+    * the history score of the move, which grows each time the move causes
+      a cutoff anywhere in the tree,
+    * closeness to the centre column, which takes part in more lines.
+
+    Each heuristic can be switched off, and any object with the same
+    ``new_search``/``order``/``cutoff`` methods can be handed to a
+    ``Searcher`` instead.
+    """
+
+    def __init__(self, tt_move=True, killers=True, history=True, centre=True):
+        """Initialize the MoveOrdering class.
+
+        Args:
+            tt_move (bool): Try the transposition table move first.
+            killers (bool): Try the killer moves of the ply next.
+            history (bool): Rank the other moves by history score.
+            centre (bool): Break ties in favour of central columns.
+        """
+        self.use_tt_move = tt_move
+        self.use_killers = killers
+        self.use_history = history
+        self.use_centre = centre
+        self.killers = []
+        self.history = []
+        self._centre_bonus = []
+        self._geometry = None
+        self._first = None
+        self._killers = ()
+        self._offset = 0
+        self._height = 0
+        self._heights = None
+        self._score_key = self._score
+
+    def new_search(self, position):
+        """Prepare for a search from ``position``.
+
+        Killer moves only make sense within one search and are cleared. The
+        history table is kept but halved, so it follows the game as it moves
+        on without being dominated by old cutoffs.
+        """
+        if position.geometry is not self._geometry:
+            self._geometry = position.geometry
+            self.history = [0] * (2 * position.geometry.size)
+            self._centre_bonus = position.geometry.centre_weights
+        else:
+            self.history = [h >> 1 for h in self.history]
+        self.killers = [[None, None] for _ in range(position.rows * position.cols + 1)]
+
+    def order(self, position, moves, ply, tt_move=None):
+        """Sort ``moves`` in place, most promising first, and return them.
+
+        Args:
+            position (Position): Position the moves are played from.
+            moves (list): Legal columns.
+            ply (int): Distance from the root of the search.
+            tt_move (int): Best move stored in the transposition table, or None.
+
+        Returns:
+            list: The same ``moves`` list, reordered.
+        """
+        # The key function is bound once in __init__ and reads the node it
+        # ranks for from these attributes, so no closure is built per node
+        self._first = tt_move if self.use_tt_move else None
+        self._killers = self.killers[ply] if self.use_killers else ()
+        self._offset = (position.player - 1) * position.geometry.size
+        self._height = position.height
+        self._heights = position.heights
+        moves.sort(key=self._score_key, reverse=True)
+        return moves
+
+    def _score(self, col):
+        if col == self._first:
+            return 1 << 62
+        killers = self._killers
+        if col in killers:
+            return (1 << 61) >> killers.index(col)
+        value = 0
+        if self.use_history:
+            value = self.history[self._offset + col * self._height + self._heights[col]] << 8
+        if self.use_centre:
+            value += self._centre_bonus[col]
+        return value
+
+    def cutoff(self, position, col, ply, depth):
+        """Record that playing ``col`` from ``position`` caused a beta cutoff.
+
+        Args:
+            position (Position): Position the move was played from.
+            col (int): The refuting column.
+            ply (int): Distance from the root of the search.
+            depth (int): Remaining depth of the node; deeper cutoffs weigh more.
+        """
+        if self.use_killers:
+            killers = self.killers[ply]
+            if killers[0] != col:
+                killers[1] = killers[0]
+                killers[0] = col
+        if self.use_history:
+            offset = (position.player - 1) * position.geometry.size
+            self.history[offset + col * position.height + position.heights[col]] += depth * depth
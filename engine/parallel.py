@@ -0,0 +1,206 @@
+import itertools
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+
+from .evaluation import WindowEvaluator, mirror_symmetric
+from .position import Position
+from .search import Searcher, SearchTimeout, WIN_SCORE
+
+# Searchers kept by each worker process between the tasks of one search,
+# so that their transposition tables carry over from one iteration to the
+# next: ``(searcher id, search number) -> Searcher``
+_worker_searchers = {}
+
+# Ids of the ParallelSearchers made in this process
+_searcher_ids = itertools.count()
+
+# How often, in seconds, a wait for the workers checks for ``stop``
+_STOP_POLL_S = 0.05
+
+
+def _search_root_move(key, moves, rows, cols, first_player, connect, weights, piece, col, depth, alpha,
+                      budget_s):
+    """Search the subtree of root move ``col`` in a worker process.
+
+    ``key`` is ``(searcher id, search number)``; a new search starts from
+    a new searcher, so nothing is carried over from earlier searches.
+
+    Returns:
+        float: The minimax value of the move for ``piece``, exact if above
+        ``alpha`` and otherwise at most ``alpha``, or None if the time
+        budget ran out first.
+    """
+    searcher = _worker_searchers.get(key)
+    if searcher is None:
+        for old_key in [k for k in _worker_searchers if k[0] == key[0]]:
+            del _worker_searchers[old_key]
+        searcher = Searcher(lambda p: p.evaluator.score(piece), piece, symmetric=mirror_symmetric(weights, cols))
+        _worker_searchers[key] = searcher
+    position = Position.from_moves(moves, rows, cols, first_player, connect)
+    WindowEvaluator(position, *weights)
+    position.play(col)
+    searcher.deadline = None if budget_s is None else time.perf_counter() + budget_s
+    try:
+        return searcher.minimax(position, depth, alpha, maximizing=position.player == piece)[1]
+    except SearchTimeout:
+        return None
+    finally:
+        searcher.deadline = None
+
+
+class ParallelSearcher:
+    """Root-splitting search that spreads the moves of the root over processes.
+
+    Every root move is an independent subtree. At each depth of an
+    iterative-deepening loop the most central move is searched first with
+    a full window, then the others side by side in a process pool with its
+    value as the lower bound, and the best move is picked in the fixed
+    centre-first column order. With ``workers=1`` the moves are searched
+    in turn in the calling process, each bounded by the best value so far.
+
+    Each search starts from fresh transposition tables, which then carry
+    over between its iterations. The chosen move and value are those of a
+    full-window search of the same depth, except that a table entry left
+    by a deeper search of another subtree can stand in for a shallower
+    one. With ``workers=1`` the search is deterministic; with more workers
+    which process searches which subtree, and so which entries it finds,
+    depends on timing.
+
+    Workers cannot receive an arbitrary evaluation function, so the
+    evaluation is given as ``WindowEvaluator`` weights.
+
+    Attributes:
+        weights (tuple): ``(weights, opponent_weights, centre_weight)`` of
+            the evaluation, e.g. ``CONNECT4_WEIGHTS``.
+        piece (int): The piece (1 or 2) to search for.
+        workers (int): Number of worker processes.
+        stopped (bool): Set by ``stop`` to abandon the running search; kept
+            until the caller sets it back to False, as for ``Searcher``.
+    """
+
+    def __init__(self, weights, piece, workers=None):
+        """Initialize the ParallelSearcher class.
+
+        Args:
+            weights (tuple): Evaluation weights, as for ``WindowEvaluator``.
+            piece (int): The piece (1 or 2) to search for.
+            workers (int): Number of worker processes; one per CPU by default.
+        """
+        self.weights = weights
+        self.piece = piece
+        self.workers = workers or os.cpu_count() or 1
+        self.stopped = False
+        self._id = next(_searcher_ids)
+        self._searches = 0
+        self._executor = None
+        if self.workers > 1:
+            # Spawned workers do not inherit the GUI state of the parent
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def iterative_deepening(self, position, max_depth, time_budget_ms=None):
+        """Search deeper and deeper until ``max_depth`` or the time budget.
+
+        Args:
+            position (Position): Position to search, with ``piece`` to move.
+            max_depth (int): Deepest iteration to run.
+            time_budget_ms (float): Wall-clock budget in milliseconds, or None.
+
+        Returns:
+            tuple: ``(column, value, depth)`` from the deepest finished iteration.
+        """
+        moves = [c for c in position.geometry.centre_order if position.can_play(c)]
+        if mirror_symmetric(self.weights, position.cols) and position.is_symmetric():
+            # The right half's subtrees mirror the left half's
+            moves = [c for c in moves if c <= position.cols - 1 - c]
+        if position.winner or not moves:
+            return None, 0, 0
+        self._searches += 1
+        deadline = None if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000
+        empty_cells = position.rows * position.cols - len(position.moves)
+
+        best = (moves[0], 0, 0)
+        for depth in range(1, max(1, min(max_depth, empty_cells)) + 1):
+            # Depth 1 always finishes so that a real move is returned
+            remaining = None if deadline is None or depth == 1 else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                break
+            values = self._search_moves(position, moves, depth - 1, remaining)
+            if values is None:
+                break
+            value, column = max(zip(values, moves), key=lambda pair: pair[0])
+            best = (column, value, depth)
+            if abs(value) >= WIN_SCORE:
+                break  # The result is forced, searching deeper changes nothing
+        return best
+
+    def _search_moves(self, position, moves, depth, budget_s):
+        """Return the values of the root ``moves``, or None if stopped or out of time.
+
+        A value that does not beat an earlier move's is only an upper bound,
+        which is enough to pick the first best move in ``moves`` order.
+        """
+        args = ((self._id, self._searches), list(position.moves), position.rows, position.cols,
+                position.first_player, position.geometry.connect, self.weights, self.piece)
+        end = None if budget_s is None else time.perf_counter() + budget_s
+        if self._executor is None:
+            values = []
+            alpha = -math.inf
+            for col in moves:
+                if self.stopped:
+                    return None
+                remaining = None if end is None else end - time.perf_counter()
+                value = _search_root_move(*args, col, depth, alpha, remaining)
+                if value is None:
+                    return None
+                values.append(value)
+                alpha = max(alpha, value)
+            return values
+
+        # The most central move first, as its value bounds all the others
+        first = self._wait([self._executor.submit(_search_root_move, *args, moves[0], depth, -math.inf, budget_s)],
+                           end)
+        if first is None or len(moves) == 1:
+            return first
+        remaining = None if end is None else end - time.perf_counter()
+        futures = [self._executor.submit(_search_root_move, *args, col, depth, first[0], remaining)
+                   for col in moves[1:]]
+        rest = self._wait(futures, end)
+        return None if rest is None else first + rest
+
+    def _wait(self, futures, end):
+        pending = futures
+        # Wait in short slices so that ``stop`` is noticed promptly
+        while pending and not self.stopped:
+            timeout = _STOP_POLL_S if end is None else min(_STOP_POLL_S, end - time.perf_counter())
+            if timeout <= 0:
+                break
+            pending = wait(pending, timeout=timeout, return_when=FIRST_EXCEPTION)[1]
+        for future in pending:
+            future.cancel()
+        if pending:
+            return None
+        values = [future.result() for future in futures]
+        if any(value is None for value in values):
+            return None
+        return values
+
+    def stop(self):
+        """Abandon the search running in another thread.
+
+        ``iterative_deepening`` returns the result of the deepest iteration
+        finished so far; workers give up at their own deadline.
+        """
+        self.stopped = True
+        searcher = _worker_searchers.get((self._id, self._searches))
+        if searcher is not None:
+            searcher.stop()  # The in-process search of ``workers=1``
+
+    def close(self):
+        """Shut the worker processes down."""
+        _worker_searchers.pop((self._id, self._searches), None)
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,137 @@
+from .book import OpeningBook
+from .cache import cache_column, cache_key
+from .evaluation import CONNECT4_WEIGHTS, WindowEvaluator, mirror_symmetric
+from .search import Searcher, SearchTimeout
+from .solver import Solver
+
+
+class AIPlayer:
+    """Computer player that picks moves for one piece, with no user interface.
+
+    A move comes from the first of these that has an answer: the opening
+    book, the exact solver (with the "perfect" difficulty, once it can
+    finish within ``solver_budget_ms``), and iterative deepening search.
+    Each search works on a private copy of the position with its own
+    evaluator, so the caller's board is never touched and may be drawn
+    from another thread in the meantime.
+
+    Attributes:
+        piece (int): The piece (1 or 2) the player moves for.
+        weights (tuple): ``(weights, opponent_weights, centre_weight)`` of
+            the evaluation, as for ``WindowEvaluator``.
+        max_depth (int): Deepest search to attempt.
+        time_budget_ms (float): Wall-clock limit for each search, or None.
+        solver_budget_ms (float): Time the solver may spend on a move.
+        searcher (Searcher): Search used when no other source answers; its
+            ``symmetric`` flag is set for the board of each ``best_move``.
+        parallel (ParallelSearcher): Root-splitting search used instead of
+            ``searcher`` when there is more than one worker, or None.
+        solver (Solver): Exact solver of the "perfect" difficulty, or None.
+        book (OpeningBook): Opening book, or None.
+        cache (ResultCache): Search results shared with other players, or
+            None.
+    """
+
+    def __init__(self, piece, weights=CONNECT4_WEIGHTS, max_depth=6, time_budget_ms=1000,
+                 difficulty="normal", solver_budget_ms=2000, workers=1, book_path=None, cache=None):
+        """Initialize the AIPlayer class.
+
+        Args:
+            piece (int): The piece (1 or 2) to move for.
+            weights (tuple): Evaluation weights, e.g. ``CONNECT4_WEIGHTS``.
+            max_depth (int): Deepest search to attempt.
+            time_budget_ms (float): Wall-clock limit for each search, or None.
+            difficulty (str): "normal" for the heuristic search, or "perfect"
+                to play solved moves on the standard 6x7 board.
+            solver_budget_ms (float): Time the solver may spend on a move.
+            workers (int): Processes the search may use; 1 searches in
+                this process.
+            book_path (str): Opening book file to play from, or None.
+            cache (ResultCache): Cache to reuse and share search results
+                through, e.g. ``process_cache()``, or None. A result found
+                there is played when it was searched at least ``max_depth``
+                deep.
+        """
+        self.piece = piece
+        self.weights = weights
+        self.max_depth = max_depth
+        self.time_budget_ms = time_budget_ms
+        self.solver_budget_ms = solver_budget_ms
+        self.searcher = Searcher(lambda position: position.evaluator.score(piece), piece)
+        self.parallel = None
+        if workers > 1:
+            # Imported here as multiprocessing is slow to load and rarely needed
+            from .parallel import ParallelSearcher
+            self.parallel = ParallelSearcher(weights, piece, workers)
+        self.solver = Solver() if difficulty == "perfect" else None
+        self.book = OpeningBook(book_path) if book_path is not None else None
+        self.cache = cache
+        self.stopped = False
+
+    def best_move(self, position):
+        """Choose a move for ``piece``, which must be the player to move.
+
+        Args:
+            position (Position): Position to move in; left unchanged.
+
+        Returns:
+            tuple: ``(column, score)``. The score is on the scale of the
+            source that answered: book, solver or search.
+        """
+        # A new request: clear the stops of the last one
+        self.stopped = False
+        for searcher in (self.searcher, self.parallel, self.solver):
+            if searcher is not None:
+                searcher.stopped = False
+        board = position.copy()
+        WindowEvaluator(board, *self.weights)
+        self.searcher.symmetric = mirror_symmetric(self.weights, board.cols)
+        if self.book is not None:
+            entry = self.book.lookup(board)
+            if entry is not None:
+                return entry
+        if self.solver is not None and self.solver.supports(board):
+            try:
+                return self.solver.best_move(board, self.solver_budget_ms)
+            except SearchTimeout:
+                pass  # Too early in the game to solve in time
+        if self.stopped:
+            return None, 0
+        key = None
+        if self.cache is not None:
+            key = cache_key(board, self.weights, self.piece)
+            entry = self.cache.get(key)
+            if entry is not None and entry[0] >= self.max_depth:
+                return cache_column(board, self.weights, entry[1]), entry[2]
+        searcher = self.parallel or self.searcher
+        column, value, depth = searcher.iterative_deepening(board, self.max_depth, self.time_budget_ms)
+        if key is not None and column is not None and not self.stopped:
+            self.cache.put(key, depth, cache_column(board, self.weights, column), value)
+        return column, value
+
+    def stop(self):
+        """Abandon the ``best_move`` call running in another thread.
+
+        It then returns whatever the deepest finished search found, which
+        may be no move at all.
+        """
+        self.stopped = True
+        for searcher in (self.searcher, self.parallel, self.solver):
+            if searcher is not None:
+                searcher.stop()
+
+    def close(self):
+        """Shut down worker processes and close the opening book."""
+        if self.parallel is not None:
+            self.parallel.close()
+        if self.book is not None:
+            self.book.close()
+
+
+def best_move(position, max_depth=6, time_budget_ms=None, weights=CONNECT4_WEIGHTS):
+    """Return ``(column, score)`` for the player to move in ``position``.
+
+    A one-off search; keep an ``AIPlayer`` to reuse its transposition table
+    from one move to the next.
+    """
+    return AIPlayer(position.player, weights, max_depth, time_budget_ms).best_move(position)
@@ -0,0 +1,235 @@
+from .geometry import geometry
+
+
+class Position:
+    """Compact bitboard representation of a Connect 4 position.
+
+    Each column uses ``rows + 1`` bits: one bit per cell plus a spare bit on
+    top, so that shifting a bitboard never carries a disc into the next
+    column. The cell ``row`` rows up from the bottom of ``col`` lives at bit
+    ``col * (rows + 1) + row``. Rows are therefore counted from the bottom;
+    front-ends that draw top-down convert with ``rows - 1 - row``.
+
+    Attributes:
+        geometry (Geometry): Shared tables for the board's shape.
+        rows (int): Number of rows on the board.
+        cols (int): Number of columns on the board.
+        boards (list): One bitboard per player; ``boards[piece - 1]``.
+        mask (int): Bitboard of every occupied cell.
+        heights (list): Number of discs in each column.
+        moves (list): Columns played so far, used by ``undo``.
+        player (int): Piece (1 or 2) of the player to move.
+        first_player (int): Piece (1 or 2) that moved first, so that
+            ``from_moves(moves, ..., first_player)`` rebuilds the position.
+        winner (int): Piece that has connected ``connect``, or 0. Updated by
+            ``play`` and ``undo`` so reading it is free.
+        hash (int): 64-bit Zobrist hash of the discs and the player to move,
+            updated incrementally by ``play`` and ``undo``.
+        mirror_hash (int): Zobrist hash of the position mirrored left to
+            right, kept up to date alongside ``hash``. A position and its
+            mirror image play the same, with the columns mirrored.
+        evaluator (WindowEvaluator): Incremental evaluator told about every
+            ``play`` and ``undo``, or None. Copies do not inherit it.
+    """
+
+    __slots__ = (
+        "geometry", "rows", "cols", "height", "boards", "mask", "heights", "moves", "player", "first_player",
+        "winner", "hash", "mirror_hash", "_piece_keys", "_mirror_keys", "_side_key", "evaluator",
+    )
+
+    def __init__(self, rows=6, cols=7, first_player=1, connect=4):
+        """Initialize an empty position.
+
+        Args:
+            rows (int): Number of rows on the board.
+            cols (int): Number of columns on the board.
+            first_player (int): Piece (1 or 2) of the player who moves first.
+            connect (int): Number of aligned discs needed to win.
+        """
+        self.geometry = geometry(rows, cols, connect)
+        self.rows = rows
+        self.cols = cols
+        self.height = rows + 1
+        self.boards = [0, 0]
+        self.mask = 0
+        self.heights = [0] * cols
+        self.moves = []
+        self.player = first_player
+        self.first_player = first_player
+        self.winner = 0
+        self._piece_keys = self.geometry.piece_keys
+        self._mirror_keys = self.geometry.mirror_piece_keys
+        self._side_key = self.geometry.side_key
+        self.hash = self.mirror_hash = self._side_key if first_player == 2 else 0
+        self.evaluator = None
+
+    @classmethod
+    def from_moves(cls, moves, rows=6, cols=7, first_player=1, connect=4):
+        """Build the position reached by playing ``moves`` from an empty board.
+
+        Args:
+            moves (iterable): Columns played, in order, counted from 0.
+
+        Returns:
+            Position: The resulting position.
+        """
+        position = cls(rows, cols, first_player, connect)
+        for col in moves:
+            if not position.can_play(col):
+                raise ValueError(f"column {col} cannot be played after {position.moves}")
+            position.play(col)
+        return position
+
+    def can_play(self, col):
+        """Return True if a disc can be dropped into ``col``."""
+        return 0 <= col < self.cols and self.heights[col] < self.rows
+
+    def legal_moves(self):
+        """Return the list of columns that are not full, left to right."""
+        rows = self.rows
+        return [c for c, h in enumerate(self.heights) if h < rows]
+
+    def play(self, col):
+        """Drop a disc for the player to move into ``col``.
+
+        The column must be playable; use ``can_play`` first when unsure.
+
+        Args:
+            col (int): Column to play.
+        """
+        index = col * self.height + self.heights[col]
+        bit = 1 << index
+        self.boards[self.player - 1] |= bit
+        self.mask |= bit
+        self.hash ^= self._piece_keys[self.player - 1][index] ^ self._side_key
+        self.mirror_hash ^= self._mirror_keys[self.player - 1][index] ^ self._side_key
+        if self.evaluator is not None:
+            self.evaluator.played(index, self.player)
+        self.heights[col] += 1
+        self.moves.append(col)
+        if self.geometry.connects(self.boards[self.player - 1]):
+            self.winner = self.player
+        self.player = 3 - self.player
+
+    def undo(self):
+        """Take back the last move.
+
+        Returns:
+            int: The column the last disc was played in.
+        """
+        col = self.moves.pop()
+        self.heights[col] -= 1
+        self.player = 3 - self.player
+        index = col * self.height + self.heights[col]
+        bit = 1 << index
+        self.boards[self.player - 1] ^= bit
+        self.mask ^= bit
+        self.hash ^= self._piece_keys[self.player - 1][index] ^ self._side_key
+        self.mirror_hash ^= self._mirror_keys[self.player - 1][index] ^ self._side_key
+        if self.evaluator is not None:
+            self.evaluator.undone(index, self.player)
+        if self.winner:
+            # Only reachable when play continued past a win.
+            self.winner = 0
+            for piece in (1, 2):
+                if self.geometry.connects(self.boards[piece - 1]):
+                    self.winner = piece
+        return col
+
+    def key(self):
+        """Return an integer that identifies the position.
+
+        The key is ``current + mask`` where ``current`` holds the discs of
+        the player to move: adding the mask turns each column's stack into a
+        unique bit pattern, so two positions share a key only if they have
+        the same discs up to swapping the colours. It fits in
+        ``cols * (rows + 1)`` bits, 49 on the standard board.
+        """
+        return self.boards[self.player - 1] + self.mask
+
+    def mirror_key(self):
+        """Return the ``key`` of the position mirrored left to right.
+
+        Each column's stack of ``key`` bits stays within the column, so the
+        columns are simply put back in reverse order.
+        """
+        key = self.key()
+        height = self.height
+        column_mask = self.geometry.column_mask
+        mirrored = 0
+        for shift in range(0, self.cols * height, height):
+            mirrored = mirrored << height | (key >> shift & column_mask)
+        return mirrored
+
+    def canonical_key(self):
+        """Return the smaller of ``key`` and ``mirror_key``.
+
+        A position and its mirror image share their canonical key, so tables
+        keyed by it store one entry for both. A column stored with the entry
+        must then be mirrored, ``cols - 1 - col``, when ``mirror_key`` is
+        the smaller.
+        """
+        return min(self.key(), self.mirror_key())
+
+    def canonical_hash(self):
+        """Return the smaller of ``hash`` and ``mirror_hash``; see ``canonical_key``."""
+        return min(self.hash, self.mirror_hash)
+
+    def is_mirrored(self):
+        """Return True if the canonical hash is the mirror image's.
+
+        Columns stored under ``canonical_hash`` are then mirrored.
+        """
+        return self.mirror_hash < self.hash
+
+    def is_symmetric(self):
+        """Return True if the position is its own mirror image.
+
+        Only the columns up to the centre then need searching: the others
+        lead to the mirror images of the same positions.
+        """
+        return self.hash == self.mirror_hash
+
+    def cell(self, row, col):
+        """Return the piece at ``(row, col)``, counting rows from the bottom.
+
+        Returns:
+            int: 0 if the cell is empty, otherwise the piece (1 or 2).
+        """
+        bit = 1 << (col * self.height + row)
+        if not self.mask & bit:
+            return 0
+        return 1 if self.boards[0] & bit else 2
+
+    def is_full(self):
+        """Return True if every cell of the board is occupied."""
+        return len(self.moves) == self.rows * self.cols
+
+    def copy(self):
+        """Return an independent copy of the position."""
+        other = Position.__new__(Position)
+        other.geometry = self.geometry
+        other.rows = self.rows
+        other.cols = self.cols
+        other.height = self.height
+        other.boards = self.boards[:]
+        other.mask = self.mask
+        other.heights = self.heights[:]
+        other.moves = self.moves[:]
+        other.player = self.player
+        other.first_player = self.first_player
+        other.winner = self.winner
+        other.hash = self.hash
+        other.mirror_hash = self.mirror_hash
+        other._piece_keys = self._piece_keys
+        other._mirror_keys = self._mirror_keys
+        other._side_key = self._side_key
+        other.evaluator = None
+        return other
+
+    def __str__(self):
+        """Return the board as text, top row first, like ``np.flip(board, 0)``."""
+        lines = []
+        for r in range(self.rows - 1, -1, -1):
+            lines.append(" ".join(str(self.cell(r, c)) for c in range(self.cols)))
+        return "\n".join(lines)
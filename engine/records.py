@@ -0,0 +1,360 @@
+"""Game records: finished games in a text and a compact binary format.
+
+The text format is the move string used by ``engine.analysis``: the 1-based
+columns played from the empty board, comma-separated on boards wider than
+9 columns, then the result, ``1`` or ``2`` for the winner, ``draw``, or
+``*`` for a game left unfinished. A game that player 2 started ends with
+``first=2``::
+
+    4455667 1
+    4455667 2 first=2
+
+The binary format stores each game as a 6-byte header (rows, cols,
+connect, result and first player, number of moves) followed by the moves,
+one 4-bit column per move, two to a byte. A 6x7 game takes at most 27
+bytes. An archive file starts with a small file header and only ever has
+records appended to it; next to it, ``<archive>.idx`` holds the byte offset
+of every record as a 64-bit integer, so any game is found without reading
+the ones before it and both files can be memory-mapped::
+
+    python -m engine.records games.c4g            # print as text
+    python -m engine.records games.c4g --from-text games.txt
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+
+from .position import Position
+
+MAGIC = b"C4GR"
+# Magic, version
+_FILE_HEADER = struct.Struct("<4sBxxx")
+# Rows, cols, connect, result and first player, move count
+_HEADER = struct.Struct("<BBBBH")
+_OFFSET = struct.Struct("<Q")
+
+DRAW, UNFINISHED = 0, 3
+_RESULT_TEXT = {1: "1", 2: "2", DRAW: "draw", UNFINISHED: "*"}
+_TEXT_RESULT = {text: result for result, text in _RESULT_TEXT.items()}
+_TEXT_FIRST_PLAYER = {"first=1": 1, "first=2": 2}
+
+
+def parse_moves(line, cols=7):
+    """Return the 0-based columns of a move string, or None for a blank line.
+
+    On boards of more than 9 columns the columns are comma-separated, on
+    smaller ones they may be either.
+
+    Anything after ``#`` or after the first space is ignored. A game with
+    no moves is written ``-``.
+
+    Raises:
+        ValueError: If the move string is malformed.
+    """
+    line = line.split("#", 1)[0].strip()
+    if not line:
+        return None
+    text = line.split()[0]
+    if text == "-":
+        return []
+    if cols > 9 or "," in text:
+        columns = [int(c) for c in text.split(",")]
+    else:
+        if not text.isdigit():
+            raise ValueError(f"not a move string: {text!r}")
+        columns = [int(c) for c in text]
+    return [c - 1 for c in columns]
+
+
+def format_moves(moves, cols=7):
+    """Return the move string of 0-based ``moves`` on a board of ``cols`` columns."""
+    if not moves:
+        return "-"
+    if cols > 9:
+        return ",".join(str(c + 1) for c in moves)
+    return "".join(str(c + 1) for c in moves)
+
+
+class GameRecord:
+    """One game: its board, the moves played and the result.
+
+    Attributes:
+        moves (list): Columns played, in order, counted from 0.
+        rows (int): Number of rows of the board.
+        cols (int): Number of columns of the board.
+        connect (int): Number of aligned discs needed to win.
+        first_player (int): Piece (1 or 2) that moved first.
+        result (int): The winning piece, ``DRAW``, or ``UNFINISHED``.
+    """
+
+    def __init__(self, moves, rows=6, cols=7, connect=4, first_player=1, result=UNFINISHED):
+        """Initialize the GameRecord class."""
+        self.moves = list(moves)
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+        self.first_player = first_player
+        self.result = result
+
+    @classmethod
+    def from_position(cls, position):
+        """Record the game that led to ``position``."""
+        if position.winner:
+            result = position.winner
+        elif position.is_full():
+            result = DRAW
+        else:
+            result = UNFINISHED
+        return cls(position.moves, position.rows, position.cols, position.geometry.connect,
+                   position.first_player, result)
+
+    def to_position(self):
+        """Replay the game and return the final position.
+
+        Raises:
+            ValueError: If a move cannot be played.
+        """
+        return Position.from_moves(self.moves, self.rows, self.cols, self.first_player, self.connect)
+
+    @classmethod
+    def from_text(cls, line, rows=6, cols=7, connect=4, first_player=1):
+        """Read a game in the text format, or return None for a blank line.
+
+        The game is replayed to find its result, which must match the one
+        given after the moves, if any. ``first_player`` is used when the
+        line does not say who moved first.
+
+        Raises:
+            ValueError: If the line is malformed, a move cannot be played
+                or the result is not the game's.
+        """
+        moves = parse_moves(line, cols)
+        if moves is None:
+            return None
+        fields = line.split("#", 1)[0].split()
+        if len(fields) > 3:
+            raise ValueError(f"unexpected text after the game: {' '.join(fields[3:])!r}")
+        if len(fields) > 2:
+            if fields[2] not in _TEXT_FIRST_PLAYER:
+                raise ValueError(f"not a first player: {fields[2]!r}")
+            first_player = _TEXT_FIRST_PLAYER[fields[2]]
+        record = cls.from_position(Position.from_moves(moves, rows, cols, first_player, connect))
+        if len(fields) > 1:
+            if fields[1] not in _TEXT_RESULT:
+                raise ValueError(f"not a game result: {fields[1]!r}")
+            if _TEXT_RESULT[fields[1]] != record.result:
+                raise ValueError(f"the game's result is {_RESULT_TEXT[record.result]!r}, not {fields[1]!r}")
+        return record
+
+    def to_text(self):
+        """Return the game in the text format."""
+        text = f"{format_moves(self.moves, self.cols)} {_RESULT_TEXT[self.result]}"
+        if self.first_player != 1:
+            text += f" first={self.first_player}"
+        return text
+
+    def encode(self):
+        """Return the game in the binary format."""
+        if self.cols > 16:
+            raise ValueError("columns of boards wider than 16 do not fit in 4 bits")
+        moves = self.moves
+        packed = bytearray((len(moves) + 1) // 2)
+        for i, col in enumerate(moves):
+            packed[i >> 1] |= col << (4 * (i & 1))
+        flags = self.result | (self.first_player - 1) << 2
+        return _HEADER.pack(self.rows, self.cols, self.connect, flags, len(moves)) + packed
+
+    @classmethod
+    def decode(cls, data, offset=0):
+        """Read the binary game starting at ``offset`` of ``data``."""
+        rows, cols, connect, flags, count = _HEADER.unpack_from(data, offset)
+        start = offset + _HEADER.size
+        packed = data[start:start + (count + 1) // 2]
+        moves = []
+        for byte in packed:
+            moves.append(byte & 15)
+            moves.append(byte >> 4)
+        del moves[count:]
+        return cls(moves, rows, cols, connect, (flags >> 2 & 1) + 1, flags & 3)
+
+    def __eq__(self, other):
+        return isinstance(other, GameRecord) and vars(self) == vars(other)
+
+    def __repr__(self):
+        return f"GameRecord({self.to_text()!r}, {self.rows}x{self.cols})"
+
+
+def _record_size(data, offset):
+    return _HEADER.size + (_HEADER.unpack_from(data, offset)[4] + 1) // 2
+
+
+class GameWriter:
+    """Appends games to an archive and its index.
+
+    Records are only ever appended, and the record is written before its
+    offset, so a crash can at worst leave a record missing from the index,
+    which ``GameArchive`` then finds on its own. Only one writer should
+    have an archive open at a time.
+    """
+
+    def __init__(self, path):
+        """Open the archive at ``path`` for appending, creating it if needed."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "ab")
+        self._index = open(path + ".idx", "ab")
+        if self._file.tell() == 0:
+            self._file.write(_FILE_HEADER.pack(MAGIC, 1))
+
+    def append(self, record):
+        """Append ``record`` and flush it to the file."""
+        offset = self._file.tell()
+        self._file.write(record.encode())
+        self._file.flush()
+        self._index.write(_OFFSET.pack(offset))
+        self._index.flush()
+
+    def close(self):
+        """Close the archive and its index."""
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def append_game(path, position):
+    """Append the game that led to ``position`` to the archive at ``path``.
+
+    Games on boards wider than 16 columns cannot be stored and are skipped.
+
+    Returns:
+        bool: True if the game was appended.
+    """
+    if position.cols > 16:
+        return False
+    with GameWriter(path) as writer:
+        writer.append(GameRecord.from_position(position))
+    return True
+
+
+class GameArchive:
+    """Read-only, random-access view of an archive file.
+
+    The archive and its index are memory-mapped, so opening even a very
+    large archive reads nothing; ``archive[i]`` decodes game ``i`` only.
+    Records appended after the index was last written are found by
+    scanning from the end of the last indexed record.
+    """
+
+    def __init__(self, path):
+        """Open and memory-map the archive at ``path``."""
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = _FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != 1:
+            self._map.close()
+            self._file.close()
+            raise ValueError(f"{path} is not a game archive")
+        self._index_file = None
+        self._index = b""
+        if os.path.exists(path + ".idx") and os.path.getsize(path + ".idx"):
+            self._index_file = open(path + ".idx", "rb")
+            self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._indexed = len(self._index) // _OFFSET.size
+        self._tail = []
+        offset = _FILE_HEADER.size
+        if self._indexed:
+            offset = self._offset(self._indexed - 1)
+            offset += _record_size(self._map, offset)
+        # A record cut short by a crash while it was written is left out
+        while offset + _HEADER.size <= len(self._map):
+            size = _record_size(self._map, offset)
+            if offset + size > len(self._map):
+                break
+            self._tail.append(offset)
+            offset += size
+
+    def _offset(self, index):
+        if index < self._indexed:
+            return _OFFSET.unpack_from(self._index, index * _OFFSET.size)[0]
+        return self._tail[index - self._indexed]
+
+    def __len__(self):
+        return self._indexed + len(self._tail)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("game index out of range")
+        return GameRecord.decode(self._map, self._offset(index))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def headers(self):
+        """Yield ``(index, rows, cols, connect, result, moves)`` for every game.
+
+        Only the fixed-size headers are read, which makes filtering a large
+        archive, e.g. by result or length, much faster than decoding it.
+        """
+        data = self._map
+        for index in range(len(self)):
+            rows, cols, connect, flags, count = _HEADER.unpack_from(data, self._offset(index))
+            yield index, rows, cols, connect, flags & 3, count
+
+    def close(self):
+        """Release the memory maps and the files."""
+        self._map.close()
+        self._file.close()
+        if self._index_file is not None:
+            self._index.close()
+            self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print or build a Connect 4 game archive.")
+    parser.add_argument("archive", help="binary archive file")
+    parser.add_argument("--from-text", help="append the games of this text file (or - for standard input)")
+    parser.add_argument("--rows", type=int, default=6, help="board of the text games")
+    parser.add_argument("--cols", type=int, default=7)
+    parser.add_argument("--connect", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.from_text:
+        lines = sys.stdin if args.from_text == "-" else open(args.from_text)
+        count = 0
+        try:
+            with GameWriter(args.archive) as writer:
+                for line in lines:
+                    record = GameRecord.from_text(line, args.rows, args.cols, args.connect)
+                    if record is not None:
+                        writer.append(record)
+                        count += 1
+        finally:
+            if lines is not sys.stdin:
+                lines.close()
+        print(f"appended {count} games to {args.archive}", file=sys.stderr)
+    else:
+        with GameArchive(args.archive) as archive:
+            for record in archive:
+                sys.stdout.write(record.to_text() + "\n")
+
+
+if __name__ == "__main__":
+    main()
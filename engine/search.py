@@ -0,0 +1,333 @@
+import math
+import time
+
+from .ordering import MoveOrdering
+from .stats import TimedEvaluator
+from .transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+WIN_SCORE = 100000000000000
+
+# Bounds of the search window; negating math.inf would build a new float
+_INF = math.inf
+_MINUS_INF = -math.inf
+
+# How many nodes are searched between two looks at the clock
+_CLOCK_CHECK_MASK = 63
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget has run out."""
+
+
+class Searcher:
+    """Depth-limited alpha-beta minimax over a ``Position``.
+
+    Scores are always from the point of view of ``piece``: the searcher
+    maximizes on that player's turns and minimizes on the opponent's.
+    Results are cached in a transposition table that is kept between calls,
+    so positions reached through different move orders, or seen again on a
+    later turn, are only searched once. When ``symmetric`` says that
+    ``evaluate`` scores mirror images alike, a position and its mirror image
+    share their entry, and at a position that is its own mirror image only
+    the columns up to the centre are searched. The order moves are tried in is
+    delegated to a pluggable ``MoveOrdering``.
+
+    Attributes:
+        evaluate (callable): Heuristic ``evaluate(position)`` used at the
+            depth limit, scored for ``piece``.
+        piece (int): The piece (1 or 2) the searcher plays for.
+        table (TranspositionTable): Cache of earlier search results.
+        ordering (MoveOrdering): Move ordering heuristics.
+        nodes (int): Number of positions visited by the last search, the
+            usual yardstick for how well the tree was pruned.
+        symmetric (bool): True if ``evaluate`` scores a position and its
+            mirror image alike, see ``mirror_symmetric``.
+        stopped (bool): Set by ``stop`` to abandon the running search. A
+            new search does not clear it, so that a stop is not lost when
+            it comes just before the search starts; the caller sets it back
+            to False when it starts a new request.
+        stats (SearchStats): Collects counters and timings of every search
+            when set; None, the default, collects nothing.
+    """
+
+    def __init__(self, evaluate, piece, table=None, ordering=None, stats=None, symmetric=False):
+        """Initialize the Searcher class.
+
+        Args:
+            evaluate (callable): Heuristic evaluation of a position for ``piece``.
+            piece (int): The piece (1 or 2) to search for.
+            table (TranspositionTable): Table to use; a new one by default.
+            ordering (MoveOrdering): Move ordering to use; centre-first with
+                transposition table, killer and history moves by default.
+            stats (SearchStats): Statistics to collect, or None.
+            symmetric (bool): True if ``evaluate`` scores mirror images alike,
+                so that they can share table entries.
+        """
+        self.evaluate = evaluate
+        self.piece = piece
+        self.table = table if table is not None else TranspositionTable()
+        self.ordering = ordering if ordering is not None else MoveOrdering()
+        self.nodes = 0
+        self.deadline = None
+        self.stopped = False
+        self.stats = stats
+        self.symmetric = symmetric
+        self._root_ply = 0
+        self._root_column = None
+        self._move_buffers = []
+        self._geometry = None
+
+    def minimax(self, position, depth, alpha=-math.inf, beta=math.inf, maximizing=True):
+        """Search ``position`` to ``depth`` plies.
+
+        Args:
+            position (Position): Position to search; restored before returning.
+            depth (int): Number of plies to look ahead.
+            alpha (float): Lower bound of the search window.
+            beta (float): Upper bound of the search window.
+            maximizing (bool): True if ``piece`` is to move.
+
+        Returns:
+            tuple: ``(column, value)``; column is None at terminal positions.
+        """
+        self._new_search(position)
+        if self.stats is None:
+            value = self._minimax(position, depth, alpha, beta, maximizing)
+            return self._root_column, value
+        evaluator = self._attach_stats(position)
+        try:
+            start = time.perf_counter()
+            value = self._minimax(position, depth, alpha, beta, maximizing)
+            self.stats.record_iteration(depth, start, self.nodes, self._root_column, value)
+            return self._root_column, value
+        finally:
+            position.evaluator = evaluator
+
+    def iterative_deepening(self, position, max_depth, time_budget_ms=None):
+        """Search one ply deeper at a time until ``max_depth`` or the time budget.
+
+        Every finished iteration leaves its best moves in the transposition
+        table, where the next iteration picks them up to order its moves.
+        The iteration running when the budget expires is abandoned, so the
+        answer always comes from a complete search. Depth 1 is always
+        finished so that a legal move is returned however small the budget.
+
+        Args:
+            position (Position): Position to search; restored before returning.
+            max_depth (int): Deepest iteration to run.
+            time_budget_ms (float): Wall-clock budget in milliseconds, or None
+                for no limit.
+
+        Returns:
+            tuple: ``(column, value, depth)`` from the deepest finished iteration.
+        """
+        self._new_search(position)
+        deadline = None if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000
+        root_ply = len(position.moves)
+        empty_cells = position.rows * position.cols - root_ply
+        maximizing = position.player == self.piece
+        evaluator = self._attach_stats(position) if self.stats is not None else position.evaluator
+
+        best = (None, 0, 0)
+        try:
+            for depth in range(1, max(1, min(max_depth, empty_cells)) + 1):
+                self.deadline = deadline if depth > 1 else None
+                start = time.perf_counter()
+                nodes = self.nodes
+                try:
+                    value = self._minimax(position, depth, _MINUS_INF, _INF, maximizing)
+                    column = self._root_column
+                except SearchTimeout:
+                    while len(position.moves) > root_ply:
+                        position.undo()
+                    break
+                if self.stats is not None:
+                    self.stats.record_iteration(depth, start, self.nodes - nodes, column, value)
+                best = (column, value, depth)
+                if abs(value) >= WIN_SCORE:
+                    break  # The result is forced, searching deeper changes nothing
+        finally:
+            self.deadline = None
+            position.evaluator = evaluator
+        return best
+
+    def stop(self):
+        """Abandon the search running in another thread.
+
+        The search raises ``SearchTimeout`` at its next look at the clock,
+        exactly as if its time budget had run out. Later searches give up
+        too until ``stopped`` is set back to False.
+        """
+        self.stopped = True
+
+    def _attach_stats(self, position):
+        # Time the evaluator's updates by standing in for it during the search
+        evaluator = position.evaluator
+        if evaluator is not None:
+            position.evaluator = TimedEvaluator(evaluator, self.stats)
+        return evaluator
+
+    def _evaluate_timed(self, position, stats):
+        start = time.perf_counter()
+        value = self.evaluate(position)
+        stats.eval_seconds += time.perf_counter() - start
+        stats.evaluations += 1
+        return value
+
+    def _search_child_timed(self, position, col, depth, alpha, beta, maximizing, stats):
+        start = time.perf_counter()
+        position.play(col)
+        stats.move_seconds += time.perf_counter() - start
+        value = self._minimax(position, depth, alpha, beta, maximizing)
+        start = time.perf_counter()
+        position.undo()
+        stats.move_seconds += time.perf_counter() - start
+        return value
+
+    def _new_search(self, position):
+        self.table.new_search()
+        self.ordering.new_search(position)
+        self.nodes = 0
+        self._root_ply = len(position.moves)
+        self._root_column = None
+        if position.geometry is not self._geometry:
+            # Per ply, one move list for every possible number of legal moves
+            self._geometry = position.geometry
+            self._move_buffers = [
+                [[0] * count for count in range(position.cols + 1)]
+                for _ in range(position.rows * position.cols + 1)
+            ]
+
+    def _minimax(self, position, depth, alpha, beta, maximizing):
+        # Returns the value only and leaves the root's best column in
+        # ``_root_column``, so that no node builds a result tuple
+        self.nodes += 1
+        if not self.nodes & _CLOCK_CHECK_MASK and (
+                self.stopped or self.deadline is not None and time.perf_counter() > self.deadline):
+            raise SearchTimeout
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+
+        winner = position.winner
+        if winner:
+            # Prefer the quickest win and the slowest loss
+            return WIN_SCORE + depth if winner == self.piece else -WIN_SCORE - depth
+        if position.is_full():
+            return 0
+        if depth == 0:
+            if stats is not None:
+                return self._evaluate_timed(position, stats)
+            return self.evaluate(position)
+
+        ply = len(position.moves) - self._root_ply
+        # A position and its mirror image share an entry, stored under the
+        # smaller hash with the move as played in that one
+        key = position.hash
+        mirrored = symmetric = False
+        if self.symmetric:
+            mirror_key = position.mirror_hash
+            symmetric = key == mirror_key
+            if mirror_key < key:
+                key = mirror_key
+                mirrored = True
+        entry = self.table.probe(key)
+        tt_move = None
+        if stats is not None:
+            stats.tt_probes += 1
+            stats.tt_hits += entry is not None
+        if entry is not None:
+            _, entry_depth, flag, value, tt_move, _ = entry
+            if mirrored and tt_move is not None:
+                tt_move = position.cols - 1 - tt_move
+            if entry_depth >= depth and (flag == EXACT or flag == LOWER and value >= beta
+                                         or flag == UPPER and value <= alpha):
+                if stats is not None:
+                    stats.tt_cutoffs += 1
+                if not ply:
+                    self._root_column = tt_move
+                return value
+
+        # Fill this ply's preallocated buffer of the right length with the
+        # legal moves, rather than building a new list at every node. The
+        # loops index with a counter: a for loop would build an iterator
+        heights = position.heights
+        rows = position.rows
+        cols = position.cols
+        if symmetric:
+            # Symmetric: the right half's moves mirror the left half's
+            cols = (cols + 1) // 2
+            count = 0
+            col = 0
+            while col < cols:
+                count += heights[col] < rows
+                col += 1
+        else:
+            count = cols - heights.count(rows)
+        moves = self._move_buffers[ply][count]
+        i = 0
+        col = 0
+        while col < cols:
+            if heights[col] < rows:
+                moves[i] = col
+                i += 1
+            col += 1
+        moves = self.ordering.order(position, moves, ply, tt_move)
+        alpha_orig, beta_orig = alpha, beta
+        column = moves[0]
+        i = 0
+        if maximizing:
+            value = _MINUS_INF
+            while i < count:
+                col = moves[i]
+                if stats is None:
+                    position.play(col)
+                    new_score = self._minimax(position, depth - 1, alpha, beta, False)
+                    position.undo()
+                else:
+                    new_score = self._search_child_timed(position, col, depth - 1, alpha, beta, False, stats)
+
+                if value < new_score:
+                    value = new_score
+                    column = col
+
+                alpha = max(value, alpha)
+                if alpha >= beta:
+                    self.ordering.cutoff(position, col, ply, depth)
+                    if stats is not None:
+                        stats.record_cutoff(i)
+                    break
+                i += 1
+        else:
+            value = _INF
+            while i < count:
+                col = moves[i]
+                if stats is None:
+                    position.play(col)
+                    new_score = self._minimax(position, depth - 1, alpha, beta, True)
+                    position.undo()
+                else:
+                    new_score = self._search_child_timed(position, col, depth - 1, alpha, beta, True, stats)
+
+                if value > new_score:
+                    value = new_score
+                    column = col
+
+                beta = min(value, beta)
+                if alpha >= beta:
+                    self.ordering.cutoff(position, col, ply, depth)
+                    if stats is not None:
+                        stats.record_cutoff(i)
+                    break
+                i += 1
+
+        if value <= alpha_orig:
+            flag = UPPER
+        elif value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, depth, flag, value, position.cols - 1 - column if mirrored else column)
+        if not ply:
+            self._root_column = column
+        return value
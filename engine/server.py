@@ -0,0 +1,388 @@
+"""Headless game server hosting many AI sessions in one process.
+
+Each TCP connection is one session against the AI. Client and server
+exchange JSON objects, one per line; columns count from 0::
+
+    python -m engine.server --port 8765 --workers 4
+
+Requests and their replies:
+
+* ``{"op": "new", "rows": 6, "cols": 7, "connect": 4, "ai_first": false,
+  "preset": "connect4", "depth": 6, "time_ms": 500}`` starts a game; every
+  field is optional. The reply holds the game state and, with
+  ``ai_first``, the AI's first move.
+* ``{"op": "move", "column": 3}`` plays the client's move and, unless the
+  game is over, the AI's reply.
+* ``{"op": "ai"}`` asks the AI to move, e.g. after a ``busy`` reply.
+* ``{"op": "stats"}`` reports the server's load.
+
+Every reply has ``ok``; failures carry an ``error``. A game state holds
+``moves``, ``winner`` (0 while nobody has won), ``over``, and, after the AI
+moved, ``ai_move`` and ``score``.
+
+Searches run in a bounded process pool, never in the event loop, so the
+server keeps answering while they run. Each session's search time is
+capped by its ``time_ms`` and the server's ``--max-time-ms``. Waiting
+searches are started in fair order, by the search time each session has
+used since it joined, so a session running deep searches waits behind
+sessions that have used little, and it still gets its turn. Backpressure
+comes in three forms. Each connection has at most one request in flight.
+A search request is answered ``busy`` when ``--max-pending`` searches
+already wait. Connections beyond ``--max-sessions`` are turned away.
+
+Each worker caches its search results for every session it serves. With
+``--shared-cache N`` the workers share one cache of ``N`` entries in shared
+memory instead, so a position searched for one session is answered at
+once for the others, whichever worker they land on.
+"""
+import argparse
+import asyncio
+import functools
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import SharedResultCache, process_cache
+from .evaluation import WEIGHT_PRESETS
+from .player import AIPlayer
+from .position import Position
+
+# Players kept by each worker process between tasks, so that their
+# transposition tables carry over from one move and session to the next
+_worker_players = {}
+
+# Search result cache of each worker process: the server's shared cache
+# when it has one, otherwise the process's own
+_worker_cache = None
+
+
+def _init_worker(cache_name, cache_capacity):
+    global _worker_cache
+    if cache_name is not None:
+        _worker_cache = SharedResultCache.attach(cache_name, cache_capacity)
+
+
+def _search_move(moves, rows, cols, first_player, connect, preset, depth, time_ms):
+    """Find the AI's move in a worker process.
+
+    Returns:
+        tuple: ``(column, score)`` for the player to move.
+    """
+    position = Position.from_moves(moves, rows, cols, first_player, connect)
+    player = _worker_players.get((preset, position.player))
+    if player is None:
+        player = AIPlayer(position.player, WEIGHT_PRESETS[preset], cache=_worker_cache or process_cache())
+        _worker_players[(preset, position.player)] = player
+    player.max_depth = depth
+    player.time_budget_ms = time_ms
+    return player.best_move(position)
+
+
+class ServerBusy(Exception):
+    """Raised when too many searches are already waiting."""
+
+
+class Session:
+    """One client's game against the AI.
+
+    Attributes:
+        id (int): Number of the session, unique within the server.
+        position (Position): The game, or None before the first ``new``.
+        preset (str): Evaluation preset of the AI.
+        depth (int): Deepest search of the AI.
+        time_ms (float): Time the AI may search for each move.
+        used_s (float): Search time used so far, in seconds.
+        finish_s (float): Fair-queuing tag of the end of its last search.
+        searches (int): Searches run so far.
+    """
+
+    def __init__(self, id):
+        """Initialize the Session class."""
+        self.id = id
+        self.position = None
+        self.preset = "connect4"
+        self.depth = 6
+        self.time_ms = 500
+        self.used_s = 0.0
+        self.finish_s = 0.0
+        self.searches = 0
+
+    def state(self):
+        """Return the game state sent to the client."""
+        position = self.position
+        return {
+            "session": self.id,
+            "moves": list(position.moves),
+            "winner": position.winner,
+            "over": bool(position.winner) or position.is_full(),
+        }
+
+
+class GameServer:
+    """Serves AI games to many clients from one asyncio event loop.
+
+    Attributes:
+        workers (int): Searches run at the same time, one per process.
+        max_sessions (int): Connections served at the same time.
+        max_pending (int): Searches allowed to wait for a worker.
+        max_time_ms (float): Longest search any session may ask for.
+        max_depth (int): Deepest search any session may ask for.
+        sessions (dict): Open sessions by id.
+        searches (int): Searches finished.
+        rejected (int): Search requests answered ``busy``.
+        cache (SharedResultCache): Search results shared by the workers, or
+            None when each worker caches its own.
+    """
+
+    def __init__(self, workers=None, max_sessions=10000, max_pending=None, max_time_ms=1000, max_depth=10,
+                 shared_cache=0):
+        """Initialize the GameServer class.
+
+        Args:
+            workers (int): Worker processes; one per CPU by default.
+            max_sessions (int): Connections served at the same time.
+            max_pending (int): Searches allowed to wait; 64 per worker by default.
+            max_time_ms (float): Cap on each session's search time per move.
+            max_depth (int): Cap on each session's search depth.
+            shared_cache (int): Entries of a search result cache in shared
+                memory that all workers use; 0 gives each its own.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_sessions = max_sessions
+        self.max_pending = max_pending if max_pending is not None else 64 * self.workers
+        self.max_time_ms = max_time_ms
+        self.max_depth = max_depth
+        self.sessions = {}
+        self.searches = 0
+        self.rejected = 0
+        self.cache = None
+        self._cache_capacity = shared_cache
+        self._ids = itertools.count(1)
+        # Waiting searches as (start tag, sequence number, future, session, args)
+        self._queue = []
+        self._order = itertools.count()
+        self._virtual_s = 0.0  # Start tag of the search started last
+        self._running = 0
+        self._executor = None
+        self._server = None
+        self._connections = {}  # Handler task of every connection, with its writer
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Start the worker processes and listen for connections.
+
+        Returns:
+            asyncio.Server: The listening server; port 0 picks a free port.
+        """
+        if self._cache_capacity:
+            self.cache = SharedResultCache(self._cache_capacity)
+        # Spawned workers do not inherit the state of the parent
+        self._executor = ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker,
+            initargs=(self.cache and self.cache.name, self._cache_capacity)
+        )
+        self._server = await asyncio.start_server(self._serve, host, port)
+        return self._server
+
+    async def close(self):
+        """Stop listening, end every session and stop the workers."""
+        if self._server is not None:
+            self._server.close()
+        for writer in self._connections.values():
+            writer.close()
+        for entry in self._queue:
+            entry[2].cancel()
+        self._queue.clear()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        if self._executor is not None:
+            # Wait for the workers to exit before the shared cache goes
+            # away, or one still starting would fail to attach to it
+            await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(self._executor.shutdown, wait=True, cancel_futures=True))
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+    async def _serve(self, reader, writer):
+        if len(self.sessions) >= self.max_sessions:
+            await self._send(writer, {"ok": False, "error": "too many sessions"})
+            writer.close()
+            return
+        session = Session(next(self._ids))
+        self.sessions[session.id] = session
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            # One request at a time: the next line is not read until the
+            # reply to this one is sent
+            while line := await reader.readline():
+                try:
+                    reply = await self.handle(session, json.loads(line))
+                except ServerBusy:
+                    reply = {"ok": False, "error": "busy"}
+                except (ValueError, KeyError, TypeError) as error:
+                    reply = {"ok": False, "error": str(error)}
+                except Exception as error:
+                    # A failed search loses this reply, not the session
+                    reply = {"ok": False, "error": f"search failed: {error!r}"}
+                await self._send(writer, reply)
+        except ConnectionError:
+            pass
+        finally:
+            del self.sessions[session.id]
+            del self._connections[task]
+            writer.close()
+
+    @staticmethod
+    async def _send(writer, reply):
+        writer.write(json.dumps(reply).encode() + b"\n")
+        await writer.drain()
+
+    async def handle(self, session, request):
+        """Answer one request of ``session``.
+
+        Returns:
+            dict: The reply.
+
+        Raises:
+            ServerBusy: If the request needs a search and too many wait.
+            ValueError: If the request is invalid.
+        """
+        op = request["op"]
+        if op == "stats":
+            return {"ok": True, **self.stats()}
+        if op == "new":
+            rows, cols, connect = int(request.get("rows", 6)), int(request.get("cols", 7)), int(request.get("connect", 4))
+            if not (1 <= rows <= 16 and 1 <= cols <= 16 and 2 <= connect <= max(rows, cols)):
+                raise ValueError(f"unsupported board {rows}x{cols}, connect {connect}")
+            preset = request.get("preset", "connect4")
+            if preset not in WEIGHT_PRESETS:
+                raise ValueError(f"unknown evaluation preset {preset!r}")
+            depth = min(int(request.get("depth", 6)), self.max_depth)
+            time_ms = min(float(request.get("time_ms", 500)), self.max_time_ms)
+            if depth < 1 or not time_ms > 0:
+                raise ValueError("depth must be at least 1 and time_ms positive")
+            # The session is only changed once the whole request is valid
+            session.position = Position(rows, cols, connect=connect)
+            session.preset, session.depth, session.time_ms = preset, depth, time_ms
+            if request.get("ai_first"):
+                return await self._ai_move(session)
+            return {"ok": True, **session.state()}
+        if session.position is None:
+            raise ValueError("no game; send a 'new' request first")
+        if op == "move":
+            column = request["column"]
+            if session.position.winner or not session.position.can_play(column):
+                raise ValueError(f"column {column} cannot be played")
+            session.position.play(column)
+            return await self._ai_move(session)
+        if op == "ai":
+            return await self._ai_move(session)
+        raise ValueError(f"unknown op {op!r}")
+
+    async def _ai_move(self, session):
+        position = session.position
+        if position.winner or position.is_full():
+            return {"ok": True, **session.state()}
+        args = (list(position.moves), position.rows, position.cols, position.first_player,
+                position.geometry.connect, session.preset, session.depth, session.time_ms)
+        column, score = await self.search(session, args)
+        # The game cannot have changed meanwhile: the session's next
+        # request is only read after this reply
+        position.play(column)
+        return {"ok": True, **session.state(), "ai_move": column, "score": score}
+
+    async def search(self, session, args):
+        """Run ``_search_move(*args)`` for ``session`` once a worker is free.
+
+        Raises:
+            ServerBusy: If ``max_pending`` searches are already waiting.
+        """
+        if len(self._queue) >= self.max_pending:
+            self.rejected += 1
+            raise ServerBusy()
+        future = asyncio.get_running_loop().create_future()
+        # Start-time fair queuing: a search is tagged with the time its
+        # session's previous one ended on a virtual clock that only the
+        # searches started move forward. Sessions that searched a lot
+        # queue behind those that did not, and new sessions start from
+        # the current time, so nobody can be put off indefinitely
+        tag = max(session.finish_s, self._virtual_s)
+        heapq.heappush(self._queue, (tag, next(self._order), future, session, args))
+        self._dispatch()
+        return await future
+
+    def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while self._running < self.workers and self._queue:
+            tag, _, future, session, args = heapq.heappop(self._queue)
+            if future.cancelled():
+                continue  # The client went away while waiting
+            self._virtual_s = tag
+            self._running += 1
+            job = loop.run_in_executor(self._executor, _search_move, *args)
+            job.add_done_callback(functools.partial(self._finished, future, session, tag, time.perf_counter()))
+
+    def _finished(self, future, session, tag, start, job):
+        self._running -= 1
+        self.searches += 1
+        elapsed = time.perf_counter() - start
+        session.used_s += elapsed
+        session.finish_s = tag + elapsed
+        session.searches += 1
+        if not future.cancelled():
+            if job.exception() is not None:
+                future.set_exception(job.exception())
+            else:
+                future.set_result(job.result())
+        self._dispatch()
+
+    def stats(self):
+        """Return the server's load as a dict of plain values."""
+        return {
+            "sessions": len(self.sessions),
+            "running": self._running,
+            "pending": len(self._queue),
+            "searches": self.searches,
+            "rejected": self.rejected,
+        }
+
+
+async def serve(host, port, **options):
+    """Run a ``GameServer`` until cancelled."""
+    server = GameServer(**options)
+    listener = await server.start(host, port)
+    print(f"serving on {', '.join(str(s.getsockname()) for s in listener.sockets)}", flush=True)
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Connect 4 games against the AI.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, help="search processes; one per CPU by default")
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--max-pending", type=int, help="searches allowed to wait; 64 per worker by default")
+    parser.add_argument("--max-time-ms", type=float, default=1000, help="cap on the search time per move")
+    parser.add_argument("--max-depth", type=int, default=10, help="cap on the search depth")
+    parser.add_argument("--shared-cache", type=int, default=0,
+                        help="entries of a search result cache shared by the workers; 0 for one per worker")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, max_sessions=args.max_sessions,
+                          max_pending=args.max_pending, max_time_ms=args.max_time_ms,
+                          max_depth=args.max_depth, shared_cache=args.shared_cache))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import time
+
+from .search import SearchTimeout
+
+WIDTH, HEIGHT = 7, 6
+_H1 = HEIGHT + 1
+_CELLS = WIDTH * HEIGHT
+_BOTTOM_MASK = sum(1 << (c * _H1) for c in range(WIDTH))
+_BOARD_MASK = _BOTTOM_MASK * ((1 << HEIGHT) - 1)
+_COLUMN_MASKS = tuple(((1 << HEIGHT) - 1) << (c * _H1) for c in range(WIDTH))
+_CENTRE_ORDER = tuple(sorted(range(WIDTH), key=lambda c: abs(2 * c - (WIDTH - 1))))
+
+MIN_SCORE = -_CELLS // 2 + 3
+MAX_SCORE = (_CELLS + 1) // 2 - 3
+
+# How many nodes are searched between two looks at the clock
+_CLOCK_CHECK_MASK = 1023
+
+
+def _winning_cells(own, mask):
+    """Return the empty cells that would complete an alignment of ``own``."""
+    # Vertical
+    r = (own << 1) & (own << 2) & (own << 3)
+    for shift in (_H1, _H1 - 1, _H1 + 1):
+        # Gap at either end or in either of the two middle cells
+        p = (own << shift) & (own << 2 * shift)
+        r |= p & (own << 3 * shift)
+        r |= p & (own >> shift)
+        p = (own >> shift) & (own >> 2 * shift)
+        r |= p & (own << shift)
+        r |= p & (own >> 3 * shift)
+    return r & (_BOARD_MASK ^ mask)
+
+
+class Solver:
+    """Exact solver for the standard 6x7 board.
+
+    Computes the game-theoretic score of a position, from the point of view
+    of the player to move: positive if they can force a win, ``0`` for a
+    draw and negative for a loss. A win with the player's ``n``-th disc
+    scores ``22 - n`` (the earlier the win, the higher the score) and a
+    loss scores the opposite.
+
+    The search is a negamax over two bitboards (the mover's discs and all
+    discs) with alpha-beta pruning and:
+
+    * null-window probes that bisect the range of possible scores,
+    * anticipation of losing moves: moves that hand the opponent an
+      immediate win are never searched, and a position facing two threats
+      is scored as lost straight away,
+    * moves ordered by how many threats they create, centre columns first,
+    * a transposition table of upper bounds keyed by ``current + mask``,
+      which is unique for every position.
+
+    Attributes:
+        nodes (int): Number of positions visited by the last ``solve`` call.
+        stopped (bool): Set by ``stop`` to abandon the running search; kept
+            until the caller sets it back to False, as for ``Searcher``.
+    """
+
+    def __init__(self, table_size=1048583):
+        """Initialize the Solver class.
+
+        Args:
+            table_size (int): Number of transposition table slots; a prime
+                spreads the keys best.
+        """
+        self.table_size = table_size
+        self._keys = [-1] * table_size
+        self._values = [0] * table_size
+        self.nodes = 0
+        self.deadline = None
+        self.stopped = False
+
+    @staticmethod
+    def supports(position):
+        """Return True if ``position`` is on the board this solver handles."""
+        return (position.rows, position.cols, position.geometry.connect) == (HEIGHT, WIDTH, 4)
+
+    def reset(self):
+        """Empty the transposition table."""
+        self._keys = [-1] * self.table_size
+        self._values = [0] * self.table_size
+
+    def stop(self):
+        """Abandon the search running in another thread with ``SearchTimeout``."""
+        self.stopped = True
+
+    def solve(self, position, weak=False, time_budget_ms=None):
+        """Return the exact score of ``position`` for the player to move.
+
+        Args:
+            position (Position): A 6x7 position without a winner.
+            weak (bool): Only find the sign of the score (win, draw or loss),
+                which is much faster.
+            time_budget_ms (float): Give up with ``SearchTimeout`` after this
+                many milliseconds; None for no limit.
+
+        Returns:
+            int: The score, or with ``weak`` its sign.
+        """
+        if not self.supports(position):
+            raise ValueError("the solver only handles the 6x7 connect 4 board")
+        self.nodes = 0
+        self.deadline = None if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000
+        try:
+            return self._solve(position.boards[position.player - 1], position.mask, len(position.moves), weak)
+        finally:
+            self.deadline = None
+
+    def analyze(self, position, time_budget_ms=None):
+        """Return the exact score of every column for the player to move.
+
+        At a position that is its own mirror image, only the columns up to
+        the centre are solved and the others are given their mirror's score.
+
+        Returns:
+            list: Per column, the score of playing there, or None if the
+            column is full.
+        """
+        if not self.supports(position):
+            raise ValueError("the solver only handles the 6x7 connect 4 board")
+        self.nodes = 0
+        self.deadline = None if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000
+        current, mask, moves = position.boards[position.player - 1], position.mask, len(position.moves)
+        scores = [None] * WIDTH
+        # A symmetric position's right half scores like its left half
+        symmetric = position.is_symmetric()
+        try:
+            for col in range(WIDTH):
+                if symmetric and col > WIDTH - 1 - col:
+                    scores[col] = scores[WIDTH - 1 - col]
+                    continue
+                move = (mask + _BOTTOM_MASK) & _COLUMN_MASKS[col]
+                if not move:
+                    continue
+                if _winning_cells(current, mask) & move:
+                    scores[col] = (_CELLS + 1 - moves) // 2
+                else:
+                    scores[col] = -self._solve(current ^ mask, mask | move, moves + 1, False)
+        finally:
+            self.deadline = None
+        return scores
+
+    def best_move(self, position, time_budget_ms=None):
+        """Return a best column for the player to move and its exact score.
+
+        Among equally scored columns the most central one is chosen.
+
+        Returns:
+            tuple: ``(column, score)``, or ``(None, 0)`` if the board is full.
+        """
+        scores = self.analyze(position, time_budget_ms)
+        columns = [c for c in _CENTRE_ORDER if scores[c] is not None]
+        if not columns:
+            return None, 0
+        column = max(columns, key=lambda c: scores[c])
+        return column, scores[column]
+
+    def _solve(self, current, mask, moves, weak):
+        if _winning_cells(current, mask) & (mask + _BOTTOM_MASK) & _BOARD_MASK:
+            return 1 if weak else (_CELLS + 1 - moves) // 2
+        low = -((_CELLS - moves) // 2)
+        high = (_CELLS + 1 - moves) // 2
+        if weak:
+            low, high = -1, 1
+        # Bisect the score range with null-window searches, probing near
+        # zero first because most positions have small scores
+        while low < high:
+            med = low + (high - low) // 2
+            if med <= 0 and int(low / 2) < med:
+                med = int(low / 2)
+            elif med >= 0 and int(high / 2) > med:
+                med = int(high / 2)
+            r = self._negamax(current, mask, moves, med, med + 1)
+            if r <= med:
+                high = r
+            else:
+                low = r
+        if weak:
+            # Fail-soft bounds can overshoot the -1..1 window
+            return (low > 0) - (low < 0)
+        return low
+
+    def _negamax(self, current, mask, moves, alpha, beta):
+        self.nodes += 1
+        if not self.nodes & _CLOCK_CHECK_MASK and (
+                self.stopped or self.deadline is not None and time.perf_counter() > self.deadline):
+            raise SearchTimeout
+
+        # Moves that do not give the opponent an immediate win
+        possible = (mask + _BOTTOM_MASK) & _BOARD_MASK
+        opponent_wins = _winning_cells(current ^ mask, mask)
+        forced = possible & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                return -((_CELLS - moves) // 2)  # Two threats to block: lost
+            possible = forced
+        possible &= ~(opponent_wins >> 1)
+        if not possible:
+            return -((_CELLS - moves) // 2)
+
+        if moves >= _CELLS - 2:
+            return 0  # Neither player can win with the last two discs
+
+        low = -((_CELLS - 2 - moves) // 2)
+        if alpha < low:
+            alpha = low
+            if alpha >= beta:
+                return alpha
+
+        high = (_CELLS - 1 - moves) // 2
+        key = current + mask
+        slot = key % self.table_size
+        if self._keys[slot] == key:
+            high = self._values[slot] + MIN_SCORE - 1
+        if beta > high:
+            beta = high
+            if alpha >= beta:
+                return beta
+
+        # Most threatening moves first; the sort is stable so ties stay
+        # in centre-first order
+        candidates = []
+        for col in _CENTRE_ORDER:
+            move = possible & _COLUMN_MASKS[col]
+            if move:
+                candidates.append((_winning_cells(current | move, mask).bit_count(), move))
+        candidates.sort(key=lambda candidate: -candidate[0])
+
+        for _, move in candidates:
+            score = -self._negamax(current ^ mask, mask | move, moves + 1, -beta, -alpha)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+
+        self._keys[slot] = key
+        self._values[slot] = alpha - MIN_SCORE + 1
+        return alpha
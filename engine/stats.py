@@ -0,0 +1,143 @@
+import json
+import time
+
+
+class SearchStats:
+    """Counters and timings collected by a ``Searcher`` that has them enabled.
+
+    Attach an instance as ``searcher.stats``; with the default None the
+    search collects nothing. Counts add up over every search until
+    ``reset``, so one instance can cover a single move or a whole game.
+
+    Time is split between evaluation (leaf evaluations plus the evaluator's
+    incremental updates as discs are played and undone) and the rest of
+    playing and undoing moves, which is the bitboard update and the win
+    check.
+
+    Attributes:
+        nodes (int): Positions visited.
+        tt_probes (int): Transposition table lookups.
+        tt_hits (int): Lookups that found the position.
+        tt_cutoffs (int): Hits that answered the node without searching it.
+        cutoffs (list): Beta cutoffs by the index of the move that caused
+            them in the ordered move list; a good ordering piles them up at 0.
+        iterations (list): One dict per finished search or iterative
+            deepening iteration, with its ``depth``, ``ms``, ``nodes``,
+            ``start_ms`` (since the stats were created or reset),
+            ``column`` and ``value``.
+        evaluations (int): Leaf evaluations.
+        eval_seconds (float): Time spent evaluating.
+        move_seconds (float): Time spent playing and undoing moves, less
+            the evaluator's share.
+    """
+
+    def __init__(self):
+        """Initialize the SearchStats class."""
+        self.reset()
+
+    def reset(self):
+        """Zero every counter."""
+        self.nodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0
+        self.cutoffs = []
+        self.iterations = []
+        self.evaluations = 0
+        self.eval_seconds = 0.0
+        self.move_seconds = 0.0
+        self._origin = time.perf_counter()
+
+    def record_cutoff(self, index):
+        """Count a beta cutoff by the move at ``index``."""
+        cutoffs = self.cutoffs
+        while len(cutoffs) <= index:
+            cutoffs.append(0)
+        cutoffs[index] += 1
+
+    def record_iteration(self, depth, start, nodes, column, value):
+        """Record a finished search to ``depth`` that began at ``start``."""
+        end = time.perf_counter()
+        self.iterations.append({
+            "depth": depth,
+            "start_ms": (start - self._origin) * 1000,
+            "ms": (end - start) * 1000,
+            "nodes": nodes,
+            "column": column,
+            "value": value,
+        })
+
+    def summary(self):
+        """Return the statistics as a dict of plain values."""
+        total_cutoffs = sum(self.cutoffs)
+        return {
+            "nodes": self.nodes,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "tt_hit_rate": self.tt_hits / self.tt_probes if self.tt_probes else None,
+            "tt_cutoffs": self.tt_cutoffs,
+            "cutoffs": list(self.cutoffs),
+            "first_move_cutoff_rate": self.cutoffs[0] / total_cutoffs if total_cutoffs else None,
+            "iterations": list(self.iterations),
+            "evaluations": self.evaluations,
+            "eval_seconds": self.eval_seconds,
+            "move_seconds": self.move_seconds,
+        }
+
+    def dump(self, path):
+        """Write the statistics to ``path`` as a trace file.
+
+        The file is in the Chrome trace event format, so it opens in
+        ``chrome://tracing`` or Perfetto with one span per iteration. The
+        ``summary`` dict is kept alongside under ``"stats"``.
+        """
+        events = [
+            {
+                "name": f"depth {iteration['depth']}",
+                "ph": "X",
+                "pid": 0,
+                "tid": 0,
+                "ts": iteration["start_ms"] * 1000,
+                "dur": iteration["ms"] * 1000,
+                "args": {"nodes": iteration["nodes"], "column": iteration["column"], "value": iteration["value"]},
+            }
+            for iteration in self.iterations
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "stats": self.summary()}, f, indent=1)
+
+
+class TimedEvaluator:
+    """Stand-in for a position's evaluator that times its incremental updates.
+
+    The searcher puts it in place of ``position.evaluator`` while a search
+    with stats runs, so that the evaluator's share of playing and undoing
+    moves can be told apart from the rest.
+    """
+
+    def __init__(self, evaluator, stats):
+        """Initialize the TimedEvaluator class.
+
+        Args:
+            evaluator (WindowEvaluator): The evaluator to wrap.
+            stats (SearchStats): Where to add the time.
+        """
+        self.evaluator = evaluator
+        self.stats = stats
+
+    def score(self, piece):
+        return self.evaluator.score(piece)
+
+    def played(self, index, piece):
+        start = time.perf_counter()
+        self.evaluator.played(index, piece)
+        elapsed = time.perf_counter() - start
+        self.stats.eval_seconds += elapsed
+        self.stats.move_seconds -= elapsed
+
+    def undone(self, index, piece):
+        start = time.perf_counter()
+        self.evaluator.undone(index, piece)
+        elapsed = time.perf_counter() - start
+        self.stats.eval_seconds += elapsed
+        self.stats.move_seconds -= elapsed
@@ -0,0 +1,219 @@
+"""Self-play tournaments between AI configurations.
+
+Plays games between two configurations from random openings, each opening
+once with either side moving first, and streams one JSON line per game
+followed by a summary line::
+
+    python -m engine.tournament connect4:depth=5 play_with_ai:depth=5 --games 100
+
+A configuration is an evaluation preset, ``connect4`` (the pygame AI's
+``Connect4.score_position``) or ``play_with_ai`` (the Tkinter AI's
+evaluator), optionally followed by ``:depth=N`` and ``:time_ms=T`` for the
+search depth and the time budget per move. Every game starts from fresh
+players, so a game's result does not depend on which worker played it or on
+the games played before it.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .evaluation import WEIGHT_PRESETS
+from .player import AIPlayer
+from .position import Position
+
+
+def parse_config(spec):
+    """Turn a configuration such as ``connect4:depth=5:time_ms=200`` into a dict.
+
+    Returns:
+        dict: ``preset``, ``max_depth`` and ``time_budget_ms``.
+    """
+    preset, *options = spec.split(":")
+    if preset not in WEIGHT_PRESETS:
+        raise ValueError(f"unknown evaluation preset {preset!r}; expected one of {sorted(WEIGHT_PRESETS)}")
+    config = {"preset": preset, "max_depth": 6, "time_budget_ms": None}
+    for option in options:
+        key, _, value = option.partition("=")
+        if key == "depth":
+            config["max_depth"] = int(value)
+        elif key == "time_ms":
+            config["time_budget_ms"] = float(value)
+        else:
+            raise ValueError(f"unknown option {key!r} in {spec!r}")
+    return config
+
+
+def random_openings(count, plies, rows=6, cols=7, connect=4, seed=None):
+    """Return ``count`` random move lists of ``plies`` moves that do not end the game."""
+    rng = random.Random(seed)
+    openings = []
+    while len(openings) < count:
+        position = Position(rows, cols, connect=connect)
+        for _ in range(plies):
+            position.play(rng.choice(position.legal_moves()))
+            if position.winner:
+                break
+        if not position.winner:
+            openings.append(list(position.moves))
+    return openings
+
+
+def play_game(index, spec_a, spec_b, opening, a_first, rows=6, cols=7, connect=4):
+    """Play one game between two configurations.
+
+    Args:
+        index (int): Game number, copied into the result.
+        spec_a (str): Configuration of player A.
+        spec_b (str): Configuration of player B.
+        opening (list): Moves played before the players take over.
+        a_first (bool): True if A makes the first move after the opening.
+
+    Returns:
+        dict: The game record, with ``result`` "a", "b" or "draw" and the
+        number of moves, nodes and milliseconds spent by each side.
+    """
+    position = Position.from_moves(opening, rows, cols, connect=connect)
+    piece_a = position.player if a_first else 3 - position.player
+    players = {}
+    for side, spec, piece in (("a", spec_a, piece_a), ("b", spec_b, 3 - piece_a)):
+        config = parse_config(spec)
+        players[piece] = side, AIPlayer(piece, WEIGHT_PRESETS[config["preset"]],
+                                        config["max_depth"], config["time_budget_ms"])
+    stats = {side: {"moves": 0, "nodes": 0, "ms": 0.0} for side in ("a", "b")}
+
+    while not position.winner and not position.is_full():
+        side, player = players[position.player]
+        start = time.perf_counter()
+        column, _ = player.best_move(position)
+        stats[side]["ms"] += (time.perf_counter() - start) * 1000
+        stats[side]["nodes"] += player.searcher.nodes
+        stats[side]["moves"] += 1
+        position.play(column)
+
+    return {
+        "game": index,
+        "a": spec_a,
+        "b": spec_b,
+        "a_first": a_first,
+        "opening": opening,
+        "moves": position.moves[len(opening):],
+        "result": players[position.winner][0] if position.winner else "draw",
+        "stats": stats,
+    }
+
+
+def elo_difference(wins, draws, losses):
+    """Return the Elo rating difference implied by a score.
+
+    Returns:
+        float: The difference, or None when there are no games or the
+        score is 0% or 100%, where the estimate is unbounded.
+    """
+    games = wins + draws + losses
+    if not games or not 0 < wins + draws / 2 < games:
+        return None
+    score = (wins + draws / 2) / games
+    return -400 * math.log10(1 / score - 1)
+
+
+def summarize(records):
+    """Combine game records into W/D/L from A's side, Elo and per-move costs."""
+    results = [record["result"] for record in records]
+    wins, draws, losses = results.count("a"), results.count("draw"), results.count("b")
+    summary = {
+        "summary": True,
+        "games": len(records),
+        "wins": wins,
+        "draws": draws,
+        "losses": losses,
+        "elo": elo_difference(wins, draws, losses),
+    }
+    for side in ("a", "b"):
+        moves = sum(record["stats"][side]["moves"] for record in records)
+        summary[side] = records[0][side] if records else None
+        summary[f"{side}_nodes_per_move"] = sum(record["stats"][side]["nodes"] for record in records) / max(moves, 1)
+        summary[f"{side}_ms_per_move"] = sum(record["stats"][side]["ms"] for record in records) / max(moves, 1)
+    return summary
+
+
+def run_tournament(spec_a, spec_b, games, opening_plies=4, rows=6, cols=7, connect=4,
+                   workers=1, seed=None, output=None):
+    """Play ``games`` games between two configurations.
+
+    Each random opening is played twice, once with either side moving first.
+
+    Args:
+        spec_a (str): Configuration of player A.
+        spec_b (str): Configuration of player B.
+        games (int): Number of games.
+        opening_plies (int): Random moves played before the players take over.
+        workers (int): Processes to play games in; 1 plays them in this process.
+        seed (int): Seed of the random openings.
+        output (file): Text file to write a JSON line to as each game ends.
+
+    Returns:
+        dict: The summary, see ``summarize``.
+    """
+    # Reject a bad configuration before any game starts
+    parse_config(spec_a)
+    parse_config(spec_b)
+    openings = random_openings((games + 1) // 2, opening_plies, rows, cols, connect, seed)
+    tasks = [
+        (index, spec_a, spec_b, openings[index // 2], index % 2 == 0, rows, cols, connect)
+        for index in range(games)
+    ]
+    records = []
+
+    def record(result):
+        records.append(result)
+        if output is not None:
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            for result in executor.map(play_game, *zip(*tasks)):
+                record(result)
+    else:
+        for task in tasks:
+            record(play_game(*task))
+
+    summary = summarize(records)
+    if output is not None:
+        output.write(json.dumps(summary) + "\n")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a tournament between two Connect 4 AI configurations.")
+    parser.add_argument("a", help="configuration of player A, e.g. connect4:depth=5:time_ms=200")
+    parser.add_argument("b", help="configuration of player B")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--opening-plies", type=int, default=4, help="random moves before the players take over")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, help="seed of the random openings")
+    parser.add_argument("--output", help="JSONL file to write; standard output by default")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=7)
+    parser.add_argument("--connect", type=int, default=4)
+    args = parser.parse_args()
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        summary = run_tournament(args.a, args.b, args.games, args.opening_plies, args.rows, args.cols,
+                                 args.connect, args.workers, args.seed, output)
+    finally:
+        if args.output:
+            output.close()
+    elo = "n/a" if summary["elo"] is None else f"{summary['elo']:+.0f}"
+    print(f"{args.a} vs {args.b}: +{summary['wins']} ={summary['draws']} -{summary['losses']}, Elo {elo}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    """Fixed-size hash table of search results keyed by Zobrist hash.
+
+    Each slot holds one ``(key, depth, flag, value, move, generation)``
+    tuple. The table never grows: a new result replaces the slot's current
+    entry when that entry is for the same position, was stored by an older
+    search, or was searched no deeper than the new one. This keeps memory
+    bounded over long sessions while keeping the most expensive results.
+
+    Attributes:
+        size (int): Number of slots, always a power of two.
+        generation (int): Counter bumped by ``new_search``.
+    """
+
+    def __init__(self, size=1 << 20):
+        """Initialize an empty table.
+
+        Args:
+            size (int): Requested number of slots, rounded up to a power of two.
+        """
+        self.size = 1 << max(0, size - 1).bit_length()
+        self._index_mask = self.size - 1
+        self.entries = [None] * self.size
+        self.generation = 0
+
+    def new_search(self):
+        """Mark the entries stored so far as belonging to an older search."""
+        self.generation += 1
+
+    def probe(self, key):
+        """Look up ``key``.
+
+        Returns:
+            tuple: The stored ``(key, depth, flag, value, move, generation)``
+            entry itself, so that a lookup allocates nothing, or None if the
+            position is not in the table.
+        """
+        entry = self.entries[key & self._index_mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, flag, value, move):
+        """Store a search result, subject to the replacement policy.
+
+        Args:
+            key (int): Zobrist hash of the position.
+            depth (int): Remaining depth the position was searched to.
+            flag (int): ``EXACT``, ``LOWER`` (value is a lower bound) or
+                ``UPPER`` (value is an upper bound).
+            value (int): Score of the position.
+            move (int): Best column found, or None.
+        """
+        index = key & self._index_mask
+        entry = self.entries[index]
+        if entry is None or entry[0] == key or entry[5] != self.generation or depth >= entry[1]:
+            self.entries[index] = (key, depth, flag, value, move, self.generation)
+
+    def clear(self):
+        """Remove every entry."""
+        self.entries = [None] * self.size
+        self.generation = 0
@@ -1,25 +1,29 @@
+import os
 import tkinter as tk
 from tkinter import messagebox
 from two_player import TwoPlayerMode
 from play_with_ai import PlayWithAI
 from PIL import Image, ImageTk
 
+# Every game played is appended here; print it with `python -m engine.records`
+RECORD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "games", "games.c4g")
+
 def start_two_player_game(rows, cols):
     """Starts a two-player Connect 4 game based on the provided rows and columns."""
     root = tk.Tk()
     root.geometry(f"{cols * 100}x{(rows + 1) * 100}")
     root.configure(bg="black")
     game = Connect4Game(root, rows, cols, "Two Player Mode")
-    two_player_game = TwoPlayerMode(rows, cols, game)
+    two_player_game = TwoPlayerMode(rows, cols, game, record_path=RECORD_PATH)
     root.mainloop()
 
-def start_play_with_ai(rows, cols):
-    """Starts a Connect 4 game against AI based on the provided rows and columns."""
+def start_play_with_ai(rows, cols, difficulty="normal"):
+    """Starts a Connect 4 game against AI based on the provided rows, columns and difficulty."""
     root = tk.Tk()
     root.geometry(f"{cols * 100}x{(rows + 1) * 100}")
     root.configure(bg="black")
     game = Connect4Game(root, rows, cols, "Play With AI")
-    play_with_ai = PlayWithAI(rows, cols, game)
+    play_with_ai = PlayWithAI(rows, cols, game, difficulty, record_path=RECORD_PATH)
     root.mainloop()
 
 class Connect4Game:
@@ -104,6 +108,11 @@ def main_menu():
     cols.bind("<FocusIn>", on_entry_click)
     cols.bind("<FocusOut>", on_focus_out)
 
+    difficulty = tk.StringVar(root, value="Normal")
+    difficulty_menu = tk.OptionMenu(root, difficulty, "Normal", "Perfect")
+    difficulty_menu.configure(bg="#4169E1", fg="white", font=("Helvetica", 12), highlightthickness=0)
+    difficulty_menu.place(relx=0.5, y=440, anchor="center")
+
     button_frame = tk.Frame(root, bg="#4169E1")
     button_frame.place(relx=0.5, y=400, anchor="center")
 
@@ -111,12 +120,12 @@ def main_menu():
                         width=15, bg="#5cb85c", fg="white", font=("Helvetica", 12), relief=tk.GROOVE)
     button1.pack(side=tk.LEFT, padx=5)
 
-    button2 = tk.Button(button_frame, text="Play with AI", command=lambda: start_play_with_ai(int(rows.get() or 6), int(cols.get() or 7)),
+    button2 = tk.Button(button_frame, text="Play with AI", command=lambda: start_play_with_ai(int(rows.get() or 6), int(cols.get() or 7), difficulty.get().lower()),
                         width=15, bg="#5bc0de", fg="white", font=("Helvetica", 12), relief=tk.GROOVE)
     button2.pack(side=tk.LEFT, padx=5)
 
     button4 = tk.Button(root, text="Exit", command=root.destroy, bg="#d9534f", fg="white", font=("Helvetica", 12), relief=tk.GROOVE)
-    button4.place(relx=0.5, y=480, anchor="center")
+    button4.place(relx=0.5, y=500, anchor="center")
 
     root.mainloop()
 
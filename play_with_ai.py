@@ -1,20 +1,46 @@
 from tkinter import messagebox
+import queue
+import threading
 import tkinter as tk
+from engine import PLAY_WITH_AI_WEIGHTS, AIPlayer, Position, WindowEvaluator
+from engine.cache import process_cache
+from engine.records import append_game
 
 class PlayWithAI:
     """Class representing the Connect 4 game against AI."""
-    def __init__(self, rows, cols, game):
+    def __init__(self, rows, cols, game, difficulty="normal", workers=1, record_path=None):
         """Initialize the PlayWithAI class.
 
         Args:
             rows (int): Number of rows in the game.
             cols (int): Number of columns in the game.
             game (Connect4Game): Instance of the Connect4Game class.
+            difficulty (str): "normal" for the heuristic search, or "perfect"
+                to play solved moves on the standard 6x7 board.
+            workers (int): Processes the search may use; 1 searches in
+                this process.
+            record_path (str): Game archive to append the game to when it
+                ends, or None to keep no record.
         """
         self.rows = rows
         self.cols = cols
         self.game = game
+        self.difficulty = difficulty
         self.turn = 1  # Human player starts
+        self.record_path = record_path
+        self.recorded = False
+        # The AI searches up to 6 plies within 1 s per move; the perfect AI
+        # may first spend 2 s trying to solve the position outright. Search
+        # results are shared with every other game in this process
+        self.ai = AIPlayer(
+            2, PLAY_WITH_AI_WEIGHTS, max_depth=6, time_budget_ms=1000,
+            difficulty=difficulty, solver_budget_ms=2000, workers=workers,
+            cache=process_cache()
+        )
+        self.poll_ms = 30  # How often the UI checks for the AI's answer
+        self.thinking = False
+        self._search_id = 0  # Bumped to disown a search that is still running
+        self._results = queue.Queue()
         self.create_game_window()
 
     def create_game_window(self):
@@ -22,92 +48,69 @@ class PlayWithAI:
         self.canvas = self.game.canvas
         self.canvas.bind("<Motion>", self.hover_over_column)
         self.canvas.bind("<Button-1>", self.drop_piece)
+        self.game.root.protocol("WM_DELETE_WINDOW", self.close)
 
         self.piece_radius = 40
         self.column_width = 100
-        self.board = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
+        self.hover_piece = None  # Canvas item of the hover disc, created on first use
+        self.hover_col = None
+        self.hover_color = None
+        self.hover_x = None  # Latest pointer position not yet shown
+        self.board = Position(self.rows, self.cols, first_player=1)
+        WindowEvaluator(self.board, *PLAY_WITH_AI_WEIGHTS)
 
     def evaluate_position(self, board):
         """Evaluate the position of the game board for AI strategy.
 
+        The board's evaluator updates the score of every window through a
+        disc as it is played or undone, so this is a constant-time lookup.
+
         Args:
-            board (list): Current state of the game board.
+            board (Position): Current state of the game board.
 
         Returns:
             int: The score of the current board position.
         """
-        score = 0
-        # Check for potential winning moves for the AI (2 in a row/column)
-        for r in range(self.rows):
-            for c in range(self.cols - 3):
-                window = board[r][c:c + 4]
-                score += self.evaluate_window(window)
-
-        for c in range(self.cols):
-            for r in range(self.rows - 3):
-                window = [board[i][c] for i in range(r, r + 4)]
-                score += self.evaluate_window(window)
-
-        for r in range(self.rows - 3):
-            for c in range(self.cols - 3):
-                window = [board[r + i][c + i] for i in range(4)]
-                score += self.evaluate_window(window)
+        return board.evaluator.score(2)
 
-        for r in range(3, self.rows):
-            for c in range(self.cols - 3):
-                window = [board[r - i][c + i] for i in range(4)]
-                score += self.evaluate_window(window)
-
-        return score
+    def hover_over_column(self, event):
+        """Show a hover effect over the column where the player is about to drop a piece.
 
-    def evaluate_window(self, window):
-        """Evaluate the score of a specific window of the game board.
+        Motion events arrive much faster than the disc needs to move, so
+        only the latest pointer position is kept and the disc is updated
+        once Tk is idle.
 
         Args:
-            window (list): A window of the game board.
-
-        Returns:
-            int: The score of the given window.
+            event (tk.Event): Mouse event containing position information.
         """
-        ai_piece = 2
-        human_piece = 1
-        score = 0
-
-        if window.count(ai_piece) == 4:
-            score += 10000
-        elif window.count(ai_piece) == 3 and window.count(0) == 1:
-            score += 100
-        elif window.count(ai_piece) == 2 and window.count(0) == 2:
-            score += 10
+        if self.hover_x is None:
+            self.canvas.after_idle(self.update_hover)
+        self.hover_x = event.x
 
-        if window.count(human_piece) == 3 and window.count(0) == 1:
-            score -= 100
-        elif window.count(human_piece) == 2 and window.count(0) == 2:
-            score -= 10
+    def update_hover(self):
+        """Move the hover disc to the column under the mouse.
 
-        return score
-
-
-    def hover_over_column(self, event):
-        """Display the hover effect when the mouse is over a column.
-
-        Args:
-            event (tk.Event): Mouse event containing position information.
+        The disc is created on the first call and from then on only moved
+        or recoloured, and only when its column or colour changes.
         """
-        col = event.x // self.column_width
-        if col >= 0 and col < self.cols:
-            self.canvas.delete("hover_piece")
-            x = col * self.column_width + self.column_width // 2
-            y = self.piece_radius
-            color = "red" if self.turn == 1 else "yellow"
-            self.canvas.create_oval(
-                x - self.piece_radius,
-                y - self.piece_radius,
-                x + self.piece_radius,
-                y + self.piece_radius,
-                fill=color, outline="",
-                tags="hover_piece"
-            )
+        col = self.hover_x // self.column_width
+        self.hover_x = None
+        if col < 0 or col >= self.cols:
+            return
+        x = col * self.column_width + self.column_width // 2
+        y = self.piece_radius
+        coords = (x - self.piece_radius, y - self.piece_radius, x + self.piece_radius, y + self.piece_radius)
+        color = "red" if self.turn == 1 else "yellow"
+        if self.hover_piece is None:
+            self.hover_piece = self.canvas.create_oval(*coords, fill=color, outline="", tags="hover_piece")
+            self.canvas.tag_raise("thinking")
+        else:
+            if col != self.hover_col:
+                self.canvas.coords(self.hover_piece, *coords)
+            if color != self.hover_color:
+                self.canvas.itemconfig(self.hover_piece, fill=color)
+        self.hover_col = col
+        self.hover_color = color
 
     def drop_piece(self, event):
         """Handle the dropping of a game piece by the player.
@@ -115,38 +118,93 @@ class PlayWithAI:
         Args:
             event (tk.Event): Mouse event containing position information.
         """
+        if self.thinking:
+            return  # Wait for the AI's move
         col = event.x // self.column_width
         if col >= 0 and col < self.cols:
             row = self.get_next_open_row(col)
             if row is not None:  # Check if the column has free space
                 self.human_move(col)
                 if not self.check_winner():
-                    self.ai_move()
+                    if self.board.is_full():
+                        self.game_over(0)  # The human played the last disc
+                    else:
+                        self.ai_move()
 
     def ai_move(self):
-        """Perform the AI's move on the game board."""
-        best_score = float('-inf')
-        best_col = 0
-
-        for col in range(self.cols):
-            if self.get_next_open_row(col) is not None:
-                row = self.get_next_open_row(col)
-                self.board[row][col] = 2  # Simulate AI move
-                score = self.minimax(self.board, 5, False, float('-inf'), float('inf'))
-                self.board[row][col] = 0  # Undo move
+        """Start the AI's move in a background thread.
 
-                if score > best_score:
-                    best_score = score
-                    best_col = col
+        The search runs on a copy of the board while the Tk mainloop keeps
+        handling events, and ``poll_ai_move`` picks the answer up through
+        ``root.after``. A "thinking" label is shown in the meantime.
+        """
+        board = self.board.copy()
+        self._search_id += 1
+        self.thinking = True
+        self.canvas.create_text(
+            self.cols * self.column_width // 2, self.piece_radius,
+            text="AI is thinking...", font=("Helvetica", 20), fill="black",
+            tags="thinking"
+        )
+        threading.Thread(target=self.search_move, args=(board, self._search_id), daemon=True).start()
+        self.game.root.after(self.poll_ms, self.poll_ai_move)
+
+    def search_move(self, board, search_id):
+        """Find the AI's move on ``board``; runs in the background thread.
+
+        The search deepens one ply at a time until ``ai.max_depth`` or until
+        ``ai.time_budget_ms`` runs out, so large boards still answer
+        promptly. The perfect AI first tries to solve the position outright
+        and only falls back to the search when that takes longer than
+        ``ai.solver_budget_ms``, which happens early in the game.
 
+        Args:
+            board (Position): Copy of the game board to search.
+            search_id (int): Identifies this search to ``poll_ai_move``.
+        """
+        best_col, best_score = self.ai.best_move(board)
+        self._results.put((search_id, best_col))
+
+    def poll_ai_move(self):
+        """Play the AI's move once the background search has answered."""
+        while True:
+            try:
+                search_id, best_col = self._results.get_nowait()
+            except queue.Empty:
+                if self.thinking:
+                    self.game.root.after(self.poll_ms, self.poll_ai_move)
+                return
+            if search_id == self._search_id:  # Skip answers to cancelled searches
+                break
+        self.thinking = False
+        self.canvas.delete("thinking")
         self.drop_piece_with_ai(best_col)
 
-        
+    def cancel_search(self):
+        """Abandon the AI's search in progress, if any."""
+        self._search_id += 1
+        self.thinking = False
+        self.canvas.delete("thinking")
+        self.ai.stop()
+
+    def record_game(self):
+        """Append the game to ``record_path``, once, unless nothing was played."""
+        if self.record_path is not None and self.board.moves and not self.recorded:
+            append_game(self.record_path, self.board)
+            self.recorded = True
+
+    def close(self):
+        """Stop the AI, record the game and close the game window."""
+        self.cancel_search()
+        self.record_game()
+        self.ai.close()
+        self.game.root.destroy()
+
     def minimax(self, board, depth, maximizing_player, alpha, beta):
         """Implement the minimax algorithm for AI decision-making.
 
         Args:
-            board (list): Current state of the game board.
+            board (Position): Current state of the game board.
             depth (int): Depth of the search tree.
             maximizing_player (bool): Indicates if the AI is maximizing.
             alpha (int): Alpha value for alpha-beta pruning.
@@ -155,51 +213,18 @@ class PlayWithAI:
         Returns:
             int: The evaluated score of the board.
         """
-        result = self.check_winner()
-        if result != 0:
-            if result == 2:
-                return 10000 - depth
-            elif result == 1:
-                return -10000 + depth
-            else:
-                return 0
-
-        if depth >= 6:  # Limiting depth for performance
-            return 0
-
-        if maximizing_player:
-            max_eval = float('-inf')
-            for col in range(self.cols):
-                if self.get_next_open_row(col) is not None:
-                    row = self.get_next_open_row(col)
-                    board[row][col] = 2  # Simulate AI move
-                    eval = self.evaluate_position(board)
-                    board[row][col] = 0  # Undo move
-                    max_eval = max(max_eval, eval)
-                    alpha = max(alpha, eval)
-                    if beta <= alpha:
-                        break
-            return max_eval
-        else:
-            min_eval = float('inf')
-            for col in range(self.cols):
-                if self.get_next_open_row(col) is not None:
-                    row = self.get_next_open_row(col)
-                    board[row][col] = 1  # Simulate human move
-                    eval = self.evaluate_position(board)
-                    board[row][col] = 0  # Undo move
-                    min_eval = min(min_eval, eval)
-                    beta = min(beta, eval)
-                    if beta <= alpha:
-                        break
-            return min_eval
+        return self.ai.searcher.minimax(board, depth, alpha, beta, maximizing_player)[1]
 
     def drop_piece_with_ai(self, col):
         """Drop the game piece for the AI.
 
         Args:
-            col (int): Column where the AI wants to drop the piece.
+            col (int): Column where the AI wants to drop the piece, or None
+                when the board is full and it has no move.
         """
+        if col is None or self.board.is_full():
+            self.game_over(0)
+            return
         row = self.get_next_open_row(col)
         if row is not None:
             x = col * self.column_width + self.column_width // 2
@@ -213,10 +238,12 @@ class PlayWithAI:
                 y + self.piece_radius,
                 fill=color, outline=""
             )
-            self.board[row][col] = 2  # Update the grid for AI
+            self.board.play(col)  # Update the grid for AI
             winner = self.check_winner()
             if winner:
                 self.game_over(winner)
+            elif self.board.is_full():
+                self.game_over(0)
             else:
                 self.turn = 1  # Switch back to human player's turn
                 
@@ -238,7 +265,7 @@ class PlayWithAI:
                 y + self.piece_radius,
                 fill=color, outline=""
             )
-            self.board[row][col] = 1  # Update the grid for the human player
+            self.board.play(col)  # Update the grid for the human player
             winner = self.check_winner()
             if winner:
                 self.game_over(winner)
@@ -253,71 +280,37 @@ class PlayWithAI:
             col (int): Column to check for available rows.
 
         Returns:
-            int: The next available row in the column.
+            int: The next available row in the column, counted from the top
+            of the canvas, or None if the column is full.
         """
-        for r in range(self.rows - 1, -1, -1):
-            if self.board[r][col] == 0:
-                return r
+        if self.board.can_play(col):
+            return self.rows - 1 - self.board.heights[col]
         return None
 
     
     def check_winner(self):
         """Check for a winner on the game board.
 
+        The board tracks the winner as discs are played, so this is a
+        constant-time lookup.
+
         Returns:
             int: 0 if no winner, 1 if human player wins, 2 if AI wins.
         """
-        for r in range(self.rows):
-            for c in range(self.cols - 3):
-                if (
-                    self.board[r][c]
-                    == self.board[r][c + 1]
-                    == self.board[r][c + 2]
-                    == self.board[r][c + 3]
-                    != 0
-                ):
-                    return self.board[r][c]
-
-        for c in range(self.cols):
-            for r in range(self.rows - 3):
-                if (
-                    self.board[r][c]
-                    == self.board[r + 1][c]
-                    == self.board[r + 2][c]
-                    == self.board[r + 3][c]
-                    != 0
-                ):
-                    return self.board[r][c]
-
-        for r in range(self.rows - 3):
-            for c in range(self.cols - 3):
-                if (
-                    self.board[r][c]
-                    == self.board[r + 1][c + 1]
-                    == self.board[r + 2][c + 2]
-                    == self.board[r + 3][c + 3]
-                    != 0
-                ):
-                    return self.board[r][c]
-
-                if (
-                    self.board[self.rows - 1 - r][c]
-                    == self.board[self.rows - 2 - r][c + 1]
-                    == self.board[self.rows - 3 - r][c + 2]
-                    == self.board[self.rows - 4 - r][c + 3]
-                    != 0
-                ):
-                    return self.board[self.rows - 1 - r][c]
-
-        return 0
+        return self.board.winner
 
 
     def game_over(self, player):
         """Handle the end of the game.
 
         Args:
-            player (int): Player who won (1 for human, 2 for AI).
+            player (int): Player who won (1 for human, 2 for AI), or 0 for
+                a draw.
         """
+        if player == 0:
+            messagebox.showinfo("Game Over", "It's a draw!")
+            self.close()
+            return
         winner = f"Player {player}"
         
         ai_score = self.evaluate_position(self.board) if player == 2 else 0
@@ -325,6 +318,6 @@ class PlayWithAI:
         
         message = f"{winner} wins!\nAI Score: {ai_score}\nHuman Score: {human_score}"
         messagebox.showinfo("Game Over", message)
-        self.game.root.destroy()  # Close the game window
+        self.close()  # Close the game window
 
 
@@ -1,20 +1,26 @@
 from tkinter import messagebox
 import tkinter as tk
+from engine import Position
+from engine.records import append_game
 
 class TwoPlayerMode:
     """Class representing the Connect 4 game in two-player mode."""
-    def __init__(self, rows, cols, game):
+    def __init__(self, rows, cols, game, record_path=None):
         """Initialize the TwoPlayerMode class.
 
         Args:
             rows (int): Number of rows in the game grid.
             cols (int): Number of columns in the game grid.
             game (Connect4Game): Instance of the Connect4Game class.
+            record_path (str): Game archive to append the game to when it
+                ends, or None to keep no record.
         """
         self.rows = rows
         self.cols = cols
         self.game = game
         self.turn = 1  # Player 1 starts
+        self.record_path = record_path
+        self.recorded = False
         self.create_game_window()
 
     def create_game_window(self):
@@ -22,32 +28,54 @@ class TwoPlayerMode:
         self.canvas = self.game.canvas
         self.canvas.bind("<Motion>", self.hover_over_column)
         self.canvas.bind("<Button-1>", self.drop_piece)
+        self.game.root.protocol("WM_DELETE_WINDOW", self.close)
 
         # Create circles as holes for the grid
         self.piece_radius = 40
         self.column_width = 100
-        self.board = [[0 for _ in range(self.cols)] for _ in range(self.rows)]  # Initialize empty grid
+        self.hover_piece = None  # Canvas item of the hover disc, created on first use
+        self.hover_col = None
+        self.hover_color = None
+        self.hover_x = None  # Latest pointer position not yet shown
+        self.board = Position(self.rows, self.cols, first_player=self.turn)  # Initialize empty grid
 
     def hover_over_column(self, event):
         """Show a hover effect over the column where the player is about to drop a piece.
 
+        Motion events arrive much faster than the disc needs to move, so
+        only the latest pointer position is kept and the disc is updated
+        once Tk is idle.
+
         Args:
             event (tk.Event): Mouse event containing position information.
         """
-        col = event.x // self.column_width
-        if col >= 0 and col < self.cols:
-            self.canvas.delete("hover_piece")  # Remove previous hover piece
-            x = col * self.column_width + self.column_width // 2
-            y = self.piece_radius
-            color = "red" if self.turn == 1 else "yellow"  # Change color based on player turn
-            self.canvas.create_oval(
-                x - self.piece_radius,
-                y - self.piece_radius,
-                x + self.piece_radius,
-                y + self.piece_radius,
-                fill=color, outline="",
-                tags="hover_piece"
-            )
+        if self.hover_x is None:
+            self.canvas.after_idle(self.update_hover)
+        self.hover_x = event.x
+
+    def update_hover(self):
+        """Move the hover disc to the column under the mouse.
+
+        The disc is created on the first call and from then on only moved
+        or recoloured, and only when its column or colour changes.
+        """
+        col = self.hover_x // self.column_width
+        self.hover_x = None
+        if col < 0 or col >= self.cols:
+            return
+        x = col * self.column_width + self.column_width // 2
+        y = self.piece_radius
+        coords = (x - self.piece_radius, y - self.piece_radius, x + self.piece_radius, y + self.piece_radius)
+        color = "red" if self.turn == 1 else "yellow"  # Change color based on player turn
+        if self.hover_piece is None:
+            self.hover_piece = self.canvas.create_oval(*coords, fill=color, outline="", tags="hover_piece")
+        else:
+            if col != self.hover_col:
+                self.canvas.coords(self.hover_piece, *coords)
+            if color != self.hover_color:
+                self.canvas.itemconfig(self.hover_piece, fill=color)
+        self.hover_col = col
+        self.hover_color = color
 
     def drop_piece(self, event):
         """Handle the dropping of a game piece by the player.
@@ -69,7 +97,7 @@ class TwoPlayerMode:
                     y + self.piece_radius,
                     fill=color, outline=""
                 )
-                self.board[row][col] = self.turn  # Update the grid
+                self.board.play(col)  # Update the grid
                 self.check_win()  # Check for win condition
                 self.turn = 2 if self.turn == 1 else 1  # Switch players
 
@@ -80,38 +108,17 @@ class TwoPlayerMode:
             col (int): Column to check for available rows.
 
         Returns:
-            int: The next available row in the column.
+            int: The next available row in the column, counted from the top
+            of the canvas, or None if the column is full.
         """
-        for r in range(self.rows - 1, -1, -1):
-            if self.board[r][col] == 0:
-                return r
+        if self.board.can_play(col):
+            return self.rows - 1 - self.board.heights[col]
         return None
 
     def check_win(self):
         """Check for a win condition in the game grid."""
-        # Check for a win in rows
-        for r in range(self.rows):
-            for c in range(self.cols - 3):
-                if self.board[r][c] == self.board[r][c + 1] == self.board[r][c + 2] == self.board[r][c + 3] != 0:
-                    self.game_over(self.board[r][c])
-
-        # Check for a win in columns
-        for c in range(self.cols):
-            for r in range(self.rows - 3):
-                if self.board[r][c] == self.board[r + 1][c] == self.board[r + 2][c] == self.board[r + 3][c] != 0:
-                    self.game_over(self.board[r][c])
-
-        # Check for a win in diagonals (top-left to bottom-right)
-        for r in range(self.rows - 3):
-            for c in range(self.cols - 3):
-                if self.board[r][c] == self.board[r + 1][c + 1] == self.board[r + 2][c + 2] == self.board[r + 3][c + 3] != 0:
-                    self.game_over(self.board[r][c])
-
-        # Check for a win in diagonals (bottom-left to top-right)
-        for r in range(3, self.rows):
-            for c in range(self.cols - 3):
-                if self.board[r][c] == self.board[r - 1][c + 1] == self.board[r - 2][c + 2] == self.board[r - 3][c + 3] != 0:
-                    self.game_over(self.board[r][c])
+        if self.board.winner:
+            self.game_over(self.board.winner)
 
     def game_over(self, player):
         """Handle the end of the game.
@@ -121,4 +128,15 @@ class TwoPlayerMode:
         """
         winner = f"Player {player}"
         messagebox.showinfo("Game Over", f"{winner} wins!")
-        self.game.root.destroy()  # Close the game window
+        self.close()  # Close the game window
+
+    def record_game(self):
+        """Append the game to ``record_path``, once, unless nothing was played."""
+        if self.record_path is not None and self.board.moves and not self.recorded:
+            append_game(self.record_path, self.board)
+            self.recorded = True
+
+    def close(self):
+        """Record the game and close the game window."""
+        self.record_game()
+        self.game.root.destroy()
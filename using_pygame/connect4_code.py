@@ -1,58 +1,37 @@
-import numpy as np
 import pygame
 import math
+import os
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from engine import Position
+
 ROW_COUNTS, COL_COUNTS = 6, 7
 BOARD_COLOR = (0, 0, 255)
 HOLE_COLOR = (0, 0, 0)
 PLAYER1_COLOR = (255, 0, 0)
 PLAYER2_COLOR = (255, 255, 0)
 
-def create_board():
-    board = np.zeros((6, 7))
+def create_board(first_player=1):
+    board = Position(ROW_COUNTS, COL_COUNTS, first_player)
     
     return board
 
-def drop_piece(board, row, col, piece):
-    board[row][col] = piece
+def drop_piece(board, col):
+    board.play(col)
 
 def is_valid_location(board, col):
-    return board[5][col] == 0
+    return board.can_play(col)
 
 def get_next_open_row(board, col):
-    for r in range(ROW_COUNTS):
-        if board[r][col] == 0:
-            return r
+    return board.heights[col]
 
 def print_board(board):
-    print(np.flip(board, axis = 0))    
+    print(board)    
     
 def winning_move(board, piece):
-    # Check all horizontal locations for win
-    
-    for c in range(COL_COUNTS - 3):
-        for r in range(ROW_COUNTS):
-            if board[r][c] == piece and board[r][c + 1] == piece and board[r][c + 2] == piece and board[r][c + 3] == piece:
-                return True
-    
-    # Check all vertical locations for win    
-    for r in range(ROW_COUNTS - 3):
-        for c in range(COL_COUNTS):
-            if board[r][c] == piece and board[r + 1][c] == piece and board[r + 2][c] == piece and board[r + 3][c] == piece:
-                return True
-    
-    # Check for positive slope diagonals
-    for r in range(ROW_COUNTS - 3):
-        for c in range(COL_COUNTS - 3):
-            if board[r][c] == piece and board[r + 1][c + 1] == piece and board[r + 2][c + 2] == piece and board[r + 3][c + 3] == piece:
-                return True
-    
-    #Check for negative slope diagonals
-    for r in range(3, ROW_COUNTS):
-        for c in range(COL_COUNTS - 3):
-            if board[r][c] == piece and board[r - 1][c + 1] == piece and board[r - 2][c + 2] == piece and board[r - 3][c + 3] == piece:
-                return True
+    # The board tracks its winner as pieces are dropped
+    return board.winner == piece
 
 
 def draw_board(board):
@@ -63,9 +42,9 @@ def draw_board(board):
     
     for r in range(ROW_COUNTS):
         for c in range(COL_COUNTS):
-            if board[r][c] == 1:
+            if board.cell(r, c) == 1:
                 pygame.draw.circle(screen, PLAYER1_COLOR, (c * SQUARESIZE + int(SQUARESIZE / 2), HEIGHT - (r * SQUARESIZE + int(SQUARESIZE / 2))), RADIUS)
-            elif board[r][c] == 2:
+            elif board.cell(r, c) == 2:
                 pygame.draw.circle(screen, PLAYER2_COLOR, (c * SQUARESIZE + int(SQUARESIZE / 2), HEIGHT - (r * SQUARESIZE  + int(SQUARESIZE / 2))), RADIUS)
 
     pygame.display.update()    
@@ -121,8 +100,7 @@ while not game_over:
                 col = int(math.floor(posx / SQUARESIZE))
                 
                 if is_valid_location(board, col):
-                    row = get_next_open_row(board, col)
-                    drop_piece(board, row, col, 1)
+                    drop_piece(board, col)
                     
                     if winning_move(board, 1):
                         # print("Player 1 wins!")
@@ -137,8 +115,7 @@ while not game_over:
                 col = int(math.floor(posx / SQUARESIZE))
                 
                 if is_valid_location(board, col):
-                    row = get_next_open_row(board, col)
-                    drop_piece(board, row, col, 2)
+                    drop_piece(board, col)
                     
                     if winning_move(board, 2):
                         # print("Player 2 wins!")
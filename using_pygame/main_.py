@@ -1,17 +1,25 @@
-import numpy as np
 import pygame
 import math
+import os
 import sys
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from engine import CONNECT4_WEIGHTS, AIPlayer, Position, WindowEvaluator
+from engine.cache import cache_column, cache_key, process_cache
+from engine.records import append_game
 
 class Connect4:
-    def __init__(self):
+    def __init__(self, difficulty="normal", workers=1, ponder=False):
         
         self.ROW_COUNTS, self.COL_COUNTS = 6, 7
         self.BOARD_COLOR = (0, 0, 255)
         self.HOLE_COLOR = (0, 0, 0)
         self.PLAYER1_COLOR = (255, 0, 0)
         self.PLAYER2_COLOR = (255, 255, 0)
+        self.DRAW_COLOR = (255, 255, 255)
 
         self.PLAYER = 0
         self.AI = 1
@@ -21,176 +29,129 @@ class Connect4:
         self.AI_PIECE = 2
 
         self.DEPTH = 5
+        self.TIME_BUDGET_MS = 1000
+        
+        # "perfect" plays solved moves once the solver can finish in time
+        self.DIFFICULTY = difficulty
+        self.SOLVER_BUDGET_MS = 2000
 
         self.ALPHA, self.BETA = -math.inf, math.inf
 
         self.WINDOW_LENGTH = 4
         
+        # Value of a window holding only the scoring player's pieces, or only
+        # the opponent's, indexed by how many pieces it holds
+        self.WINDOW_WEIGHTS, self.OPPONENT_WINDOW_WEIGHTS, self.CENTER_WEIGHT = CONNECT4_WEIGHTS
+        
         self.turn = random.randint(self.PLAYER, self.AI)
         
+        # More than one worker searches the root moves in separate processes
+        self.WORKERS = workers
+        
+        # Precomputed first moves; built with `python -m engine.book`
+        self.BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "books", "opening_6x7.bin")
+        
+        # The AI plays from the book, then the solver (perfect), then the search.
+        # Search results go to a cache kept across "play again" rounds
+        self.ai = AIPlayer(self.AI_PIECE, CONNECT4_WEIGHTS, self.DEPTH, self.TIME_BUDGET_MS, difficulty,
+                           self.SOLVER_BUDGET_MS, workers, self.BOOK_PATH if os.path.exists(self.BOOK_PATH) else None,
+                           process_cache())
+        
+        # Searches run in a background thread so that the event loop keeps going
+        self.FPS = 60
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        
+        # With PONDER the AI searches the human's possible replies while they think
+        self.PONDER = ponder
+        self.pondering = threading.Event()
+        
+        # Every game played is appended here; print it with `python -m engine.records`
+        self.RECORD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "games", "games.c4g")
+        
     def create_board(self):
         
-        board = np.zeros((self.ROW_COUNTS, self.COL_COUNTS))
+        first_player = self.PLAYER_PIECE if self.turn == self.PLAYER else self.AI_PIECE
+        board = Position(self.ROW_COUNTS, self.COL_COUNTS, first_player, self.WINDOW_LENGTH)
+        WindowEvaluator(board, self.WINDOW_WEIGHTS, self.OPPONENT_WINDOW_WEIGHTS, self.CENTER_WEIGHT)
         return board
     
 
-    def drop_piece(self, board, row, col, piece):
-        board[row][col] = piece
+    def record_game(self, board):
+        if board.moves:
+            append_game(self.RECORD_PATH, board)
+
+    def drop_piece(self, board, col):
+        board.play(col)
 
     def is_valid_location(self, board, col):
-        return board[5][col] == 0
+        return board.can_play(col)
 
     def get_next_open_row(self, board, col):
-        for r in range(self.ROW_COUNTS):
-            if board[r][col] == 0:
-                return r
+        return board.heights[col]
 
     def print_board(self, board):
-        print(np.flip(board, axis = 0))    
+        print(board)    
         
     def winning_move(self, board, piece):
-        # Check all horizontal locations for win
-        
-        for c in range(self.COL_COUNTS - 3):
-            for r in range(self.ROW_COUNTS):
-                if board[r][c] == piece and board[r][c + 1] == piece and board[r][c + 2] == piece and board[r][c + 3] == piece:
-                    return True
-        
-        # Check all vertical locations for win    
-        for r in range(self.ROW_COUNTS - 3):
-            for c in range(self.COL_COUNTS):
-                if board[r][c] == piece and board[r + 1][c] == piece and board[r + 2][c] == piece and board[r + 3][c] == piece:
-                    return True
-        
-        # Check for positive slope diagonals
-        for r in range(self.ROW_COUNTS - 3):
-            for c in range(self.COL_COUNTS - 3):
-                if board[r][c] == piece and board[r + 1][c + 1] == piece and board[r + 2][c + 2] == piece and board[r + 3][c + 3] == piece:
-                    return True
-        
-        #Check for negative slope diagonals
-        for r in range(3, self.ROW_COUNTS):
-            for c in range(self.COL_COUNTS - 3):
-                if board[r][c] == piece and board[r - 1][c + 1] == piece and board[r - 2][c + 2] == piece and board[r - 3][c + 3] == piece:
-                    return True
-
-    def evaluate_window(self, window, piece):
-        score = 0
-        OPPONENT_PIECE = self.PLAYER_PIECE
-        if piece == self.PLAYER_PIECE:
-            opponent_piece = self.AI_PIECE
-        
-        if window.count(piece) == 4:
-            score += 100
-        elif window.count(piece) == 3 and window.count(self.EMPTY) == 1:
-            score += 5
-        elif window.count(piece) == 2 and window.count(self.EMPTY) == 2:
-            score += 2
-            
-        if window.count(OPPONENT_PIECE) == 3 and window.count(self.EMPTY) == 1:
-            score -= 4
-            
-        return score
+        # The board tracks its winner as pieces are dropped
+        return board.winner == piece
 
     def score_position(self, board, piece):
-        score = 0
-        
-        # Center Piece Score
-        center_array = [int(i) for i in list(board[:, self.COL_COUNTS // 2])]
-        center_count = center_array.count(piece)
+        # The board's evaluator keeps every window's score up to date as pieces are dropped
+        return board.evaluator.score(piece)
+
+    def is_terminal_node(self, board):
+        return board.winner != 0 or board.is_full()
+
+    def minimax(self, board, depth, alpha, beta, maximizingPlayer):
+        # Alpha-beta search with a transposition table kept across turns and games
+        return self.ai.searcher.minimax(board, depth, alpha, beta, maximizingPlayer)
         
-        score += center_count * 3
 
-        # Horizontal Score    
-        for r in range(self.ROW_COUNTS):
-            row_array = [int(i) for i in list(board[r, :])]
-            
-            for c in range(self.COL_COUNTS - 3):
-                window = row_array[c: c + self.WINDOW_LENGTH]
-                score += self.evaluate_window(window, piece)
-                    
-        # Vertical Score
-        for r in range(self.COL_COUNTS):
-            col_array = [int(i) for i in list(board[: ,c])]
-            
-            for r in range(self.ROW_COUNTS - 3):
-                window = col_array[r: r + self.WINDOW_LENGTH] 
-                score += self.evaluate_window(window, piece)
+    def best_move(self, board):
+        return self.ai.best_move(board)
 
-                
-        # Positive Slope Diagonals Score
-        for r in range(self.ROW_COUNTS - 3):
-            for c in range(self.COL_COUNTS - 3):
-                window = [board[r + i][c + i] for i in range(self.WINDOW_LENGTH)] 
-                score += self.evaluate_window(window, piece)
-                
-        # Negative Slope Diagonals Score
-        for r in range(self.ROW_COUNTS - 3):
-            for c in range(self.COL_COUNTS - 3):
-                window = [board[r + 3 - i][c + i] for i in range(self.WINDOW_LENGTH)]
-                score += self.evaluate_window(window, piece)
+    def copy_board(self, board):
+        # Searches get their own board, so drawing never sees a half-searched one
+        copy = board.copy()
+        WindowEvaluator(copy, self.WINDOW_WEIGHTS, self.OPPONENT_WINDOW_WEIGHTS, self.CENTER_WEIGHT)
+        return copy
 
-        return score
+    def start_best_move(self, board):
+        # Returns a future that resolves to best_move(board)
+        self.stop_pondering()
+        return self.executor.submit(self.best_move, board.copy())
 
-    def is_terminal_node(self, board):
-        return self.winning_move(board, self.PLAYER_PIECE) or self.winning_move(board, self.AI_PIECE) or len(self.get_valid_locations(board)) == 0
+    def start_pondering(self, board):
+        self.pondering.set()
+        self.executor.submit(self.ponder, self.copy_board(board))
 
-    def minimax(self, board, depth, alpha, beta, maximizingPlayer):
-        valid_locations = self.get_valid_locations(board)
-        is_terminal = self.is_terminal_node(board)
-        if depth == 0 or is_terminal:
-            if is_terminal:
-                if self.winning_move(board, self.AI_PIECE):
-                    return (None, 100000000000000)
-                elif self.winning_move(board, self.PLAYER_PIECE):
-                    return (None, -100000000000000)
-                else: # Game is over, no more valid moves
-                    return (None, 0)
-            else: # Depth is 0
-                return (None, self.score_position(board, self.AI_PIECE))
-                
-        if maximizingPlayer: 
-            value = -math.inf
-            column = random.choice(valid_locations)
-            
-            for col in valid_locations:
-                row = self.get_next_open_row(board, col)
-                board_copy = board.copy()
-                self.drop_piece(board_copy, row, col, self.AI_PIECE)
-                new_score = self.minimax(board_copy, depth - 1, alpha, beta, False)[1]
-                
-                if value < new_score:
-                    value = new_score
-                    column = col
-                    
-                alpha = max(value, alpha)
-                
-                if alpha >= beta:
-                    break
+    def ponder(self, board):
+        # Search every reply the human may play, most likely first. The results
+        # stay in the transposition table and the cache, where the AI's next
+        # move finds them. A stop_pondering from now on stops the searches.
+        self.ai.searcher.stopped = False
+        for col in board.geometry.centre_order:
+            if not self.pondering.is_set():
+                return
+            if not board.can_play(col):
+                continue
+            board.play(col)
+            if not self.is_terminal_node(board):
+                column, value, depth = self.ai.searcher.iterative_deepening(board, self.DEPTH, self.TIME_BUDGET_MS)
+                if column is not None and not self.ai.searcher.stopped:
+                    self.ai.cache.put(cache_key(board, CONNECT4_WEIGHTS, self.AI_PIECE), depth,
+                                      cache_column(board, CONNECT4_WEIGHTS, column), value)
+            board.undo()
 
-            return column, value
+    def stop_pondering(self):
+        if self.pondering.is_set():
+            self.pondering.clear()
+            self.ai.searcher.stop()
 
-        else:
-            value = math.inf
-            column = random.choice(valid_locations)
-            
-            for col in valid_locations:
-                row = self.get_next_open_row(board, col)
-                board_copy = board.copy()
-                self.drop_piece(board_copy, row, col, self.PLAYER_PIECE)
-                new_score = self.minimax(board_copy, depth - 1, alpha, beta, True)[1]
-                
-                if value > new_score:
-                    value = new_score
-                    column = col
-                    
-                beta = min(value, beta)
-                
-                if alpha >= beta:
-                    break
-        
-            return column, value
-        
+    def stop_search(self):
+        self.stop_pondering()
+        self.ai.stop()
 
     def get_valid_locations(self, board):
         valid_locations = []
@@ -208,10 +169,9 @@ class Connect4:
         best_col = random.choice(valid_locations)
         
         for col in valid_locations:
-            row = self.get_next_open_row(board, col)
-            temp_board = board.copy()
-            self.drop_piece(temp_board, row, col, piece)
-            score = self.score_position(temp_board, piece)
+            self.drop_piece(board, col)
+            score = self.score_position(board, piece)
+            board.undo()
             
             if best_score < score:
                 best_score = score
@@ -227,37 +187,68 @@ class GAMEUI:
         self.HEIGHT = (self.connect4.ROW_COUNTS + 1) * self.SQUARESIZE
         self.RADIUS = int(self.SQUARESIZE / 2 - 5)
         self.play_again = False
+        
+        # Areas of the screen changed since the last update_display()
+        self.dirty = []
+        self.drawn_board = None
+        self.drawn_moves = 0
 
     def initialize_pygame(self):
         pygame.init()
         SIZE = (self.WIDTH, self.HEIGHT)
         self.screen = pygame.display.set_mode(SIZE)
+        self.TOP_ROW = pygame.Rect(0, 0, self.WIDTH, self.SQUARESIZE)
+        self.prompt_font = pygame.font.SysFont("monospace", 30)
+        
+        # The empty board never changes, so it is drawn once and blitted from then on
+        self.board_surface = pygame.Surface((self.WIDTH, self.HEIGHT - self.SQUARESIZE))
+        for r in range(self.connect4.ROW_COUNTS):
+            for c in range(self.connect4.COL_COUNTS):
+                pygame.draw.rect(self.board_surface, self.connect4.BOARD_COLOR, (c * self.SQUARESIZE, r * self.SQUARESIZE, self.SQUARESIZE, self.SQUARESIZE))
+                pygame.draw.circle(self.board_surface, self.connect4.HOLE_COLOR, (c * self.SQUARESIZE + int(self.SQUARESIZE / 2), r * self.SQUARESIZE + int(self.SQUARESIZE / 2)), self.RADIUS)
+        
         # self.draw_board(self.connect4.board)
         board = self.connect4.create_board()
         self.draw_board(board)
+        self.update_display()
         
         return board
         
     def draw_board(self, board):
-        for r in range(self.connect4.ROW_COUNTS):
-            for c in range(self.connect4.COL_COUNTS):
-                pygame.draw.rect(self.screen, self.connect4.BOARD_COLOR, (c * self.SQUARESIZE, r * self.SQUARESIZE + self.SQUARESIZE, self.SQUARESIZE, self.SQUARESIZE))
-                pygame.draw.circle(self.screen, self.connect4.HOLE_COLOR, (c * self.SQUARESIZE + int(self.SQUARESIZE / 2), r * self.SQUARESIZE + self.SQUARESIZE + int(self.SQUARESIZE / 2)), self.RADIUS)
+        # Only the discs played since the last call are drawn; a new board
+        # starts again from the cached empty one
+        if board is not self.drawn_board or len(board.moves) < self.drawn_moves:
+            self.dirty.append(self.screen.blit(self.board_surface, (0, self.SQUARESIZE)))
+            self.drawn_board = board
+            self.drawn_moves = 0
         
-        for r in range(self.connect4.ROW_COUNTS):
-            for c in range(self.connect4.COL_COUNTS):
-                if board[r][c] == self.connect4.PLAYER_PIECE:
-                    pygame.draw.circle(self.screen, self.connect4.PLAYER1_COLOR, (c * self.SQUARESIZE + int(self.SQUARESIZE / 2), self.HEIGHT - (r * self.SQUARESIZE + int(self.SQUARESIZE / 2))), self.RADIUS)
-                elif board[r][c] == self.connect4.AI_PIECE:
-                    pygame.draw.circle(self.screen, self.connect4.PLAYER2_COLOR, (c * self.SQUARESIZE + int(self.SQUARESIZE / 2), self.HEIGHT - (r * self.SQUARESIZE  + int(self.SQUARESIZE / 2))), self.RADIUS)
-
-        pygame.display.update() 
+        for i in range(self.drawn_moves, len(board.moves)):
+            c = board.moves[i]
+            r = board.moves[:i].count(c)
+            if board.cell(r, c) == self.connect4.PLAYER_PIECE:
+                color = self.connect4.PLAYER1_COLOR
+            else:
+                color = self.connect4.PLAYER2_COLOR
+            self.dirty.append(pygame.draw.circle(self.screen, color, (c * self.SQUARESIZE + int(self.SQUARESIZE / 2), self.HEIGHT - (r * self.SQUARESIZE + int(self.SQUARESIZE / 2))), self.RADIUS))
+        self.drawn_moves = len(board.moves)
+        
+    def clear_top_row(self):
+        pygame.draw.rect(self.screen, self.connect4.HOLE_COLOR, self.TOP_ROW)
+        self.dirty.append(self.TOP_ROW)
+        
+    def show_message(self, label):
+        self.dirty.append(self.screen.blit(label, (40, 10)))
+        
+    def update_display(self):
+        # Push only the changed areas to the screen
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
         
     def draw_play_again_prompt(self):
-        pygame.draw.rect(self.screen, self.connect4.HOLE_COLOR, (0, 0, self.WIDTH, self.SQUARESIZE))
-        font = pygame.font.SysFont("monospace", 30)
-        text = font.render("Press 1 to play again or 2 to exit", True, (255, 255, 255))
-        self.screen.blit(text, (20, self.HEIGHT - 50))
+        self.clear_top_row()
+        text = self.prompt_font.render("Press 1 to play again or 2 to exit", True, (255, 255, 255))
+        self.dirty.append(self.screen.blit(text, (20, self.HEIGHT - 50)))
 
     def handle_play_again_input(self):
         keys = pygame.key.get_pressed()
@@ -271,7 +262,9 @@ class GAMEUI:
         self.play_again = False
         
 if __name__ == "__main__":
-    connect4_game = Connect4()
+    args = sys.argv[1:]
+    workers = int(args[args.index("--workers") + 1]) if "--workers" in args else 1
+    connect4_game = Connect4("perfect" if "--perfect" in args else "normal", workers, "--ponder" in args)
     game_ui = GAMEUI(connect4_game)
     
     board = game_ui.initialize_pygame()
@@ -279,104 +272,127 @@ if __name__ == "__main__":
     game_over = False
     
     display_font = pygame.font.SysFont("monospace", 50)
+    thinking_label = display_font.render("AI is thinking...", 1, (255, 255, 255))
+    
+    clock = pygame.time.Clock()
+    ai_future = None
 
     while True:
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                game_ui.connect4.stop_search()
+                if not game_over:
+                    game_ui.connect4.record_game(board)
                 sys.exit()
                 
             if not game_over:
                 
                 if event.type == pygame.MOUSEMOTION:
-                    pygame.draw.rect(game_ui.screen, game_ui.connect4.HOLE_COLOR, (0, 0, game_ui.WIDTH, game_ui.SQUARESIZE))
+                    game_ui.clear_top_row()
                     
                     posx = event.pos[0]
                     
                     if game_ui.connect4.turn == game_ui.connect4.PLAYER:
                         pygame.draw.circle(game_ui.screen, game_ui.connect4.PLAYER1_COLOR, (posx, int(game_ui.SQUARESIZE / 2)), game_ui.RADIUS)
-                    # else:
-                    #     pygame.draw.circle(screen, PLAYER2_COLOR, (posx, int(SQUARESIZE / 2)), RADIUS)
-                        
-                pygame.display.update()
+                    elif ai_future is not None:
+                        game_ui.show_message(thinking_label)
                     
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     # print(event.pos)
                     # Ask for player 1 input
-                    pygame.draw.rect(game_ui.screen, game_ui.connect4.HOLE_COLOR, (0, 0, game_ui.WIDTH, game_ui.SQUARESIZE))
+                    game_ui.clear_top_row()
                     
                     if game_ui.connect4.turn == game_ui.connect4.PLAYER:
                         posx = event.pos[0]
                         col = int(math.floor(posx / game_ui.SQUARESIZE))
                         
                         if game_ui.connect4.is_valid_location(board, col):
-                            row = game_ui.connect4.get_next_open_row(board, col)
-                            game_ui.connect4.drop_piece(board, row, col, 1)
+                            game_ui.connect4.drop_piece(board, col)
                             
                             if game_ui.connect4.winning_move(board, game_ui.connect4.PLAYER_PIECE):
                                 # print("Player 1 wins!")
                                 label = display_font.render("Player 1 Wins!!", 1, game_ui.connect4.PLAYER1_COLOR)
-                                game_ui.screen.blit(label, (40, 10))
+                                game_ui.show_message(label)
                                 
                                 game_over = True
+                                game_ui.connect4.record_game(board)
+                            elif board.is_full():
+                                label = display_font.render("It's a draw!", 1, game_ui.connect4.DRAW_COLOR)
+                                game_ui.show_message(label)
+                                
+                                game_over = True
+                                game_ui.connect4.record_game(board)
                                 
                             game_ui.connect4.turn += 1
                             game_ui.connect4.turn %= 2
                             # game_ui.connect4.print_board(board)        
                             game_ui.draw_board(board)
 
-                    # # Ask for player 2 input
-                if game_ui.connect4.turn == game_ui.connect4.AI and not game_over:
-                    
-                    # col = pick_best_move(board, AI_PIECE)
-                    label = display_font.render("AI is thinking...", 1, (255, 255, 255))
-                    game_ui.screen.blit(label, (40, 10))
-                    
-                    pygame.display.update()  
-                    col, score = game_ui.connect4.minimax(board, game_ui.connect4.DEPTH, game_ui.connect4.ALPHA, game_ui.connect4.BETA, True)
-                    
-                    if game_ui.connect4.is_valid_location(board, col):
-                        # pygame.time.wait(700)
-                        row = game_ui.connect4.get_next_open_row(board, col)
-                        game_ui.connect4.drop_piece(board, row, col, 2)
-                        
-                        if game_ui.connect4.winning_move(board, game_ui.connect4.AI_PIECE):
-                            # print("Player 2 wins!")
-                            label = display_font.render("Player 2 Wins!!", 1, game_ui.connect4.PLAYER2_COLOR)
-                            game_ui.screen.blit(label, (40, 10))
-                            game_over = True
-                        
-                        # print_board(board)   
-                        game_ui.draw_board(board)
-      
-                        pygame.display.update()   
-                
-                        game_ui.connect4.turn += 1
-                        game_ui.connect4.turn %= 2
-                        
-                        game_ui.draw_board(board)
-                        
             else:
                 game_ui.draw_play_again_prompt()
-                pygame.display.update()
                 
                 game_ui.handle_play_again_input()
-                pygame.display.update()
                 
 
                 if game_ui.play_again:
                     # Reset necessary game elements for a new game
-                    board = game_ui.connect4.create_board()
                     game_ui.connect4.turn = game_ui.connect4.PLAYER
+                    board = game_ui.connect4.create_board()
                     game_ui.draw_board(board)
                     game_over = False
                     game_ui.reset_game()  # Reset the play_again flag
-                
-                    pygame.display.update()
                 else:
                     break
                 
-        pygame.display.flip()
+        # Ask for player 2 input without blocking the event loop
+        if game_ui.connect4.turn == game_ui.connect4.AI and not game_over:
+            
+            if ai_future is None:
+                # col = pick_best_move(board, AI_PIECE)
+                game_ui.show_message(thinking_label)
+                
+                ai_future = game_ui.connect4.start_best_move(board)
+                
+            elif ai_future.done():
+                col, score = ai_future.result()
+                ai_future = None
+                game_ui.clear_top_row()
+                
+                if col is None:
+                    # No move left for the AI: the board is full
+                    label = display_font.render("It's a draw!", 1, game_ui.connect4.DRAW_COLOR)
+                    game_ui.show_message(label)
+                    game_over = True
+                    game_ui.connect4.record_game(board)
+                elif game_ui.connect4.is_valid_location(board, col):
+                    # pygame.time.wait(700)
+                    game_ui.connect4.drop_piece(board, col)
+                    
+                    if game_ui.connect4.winning_move(board, game_ui.connect4.AI_PIECE):
+                        # print("Player 2 wins!")
+                        label = display_font.render("Player 2 Wins!!", 1, game_ui.connect4.PLAYER2_COLOR)
+                        game_ui.show_message(label)
+                        game_over = True
+                        game_ui.connect4.record_game(board)
+                    elif board.is_full():
+                        label = display_font.render("It's a draw!", 1, game_ui.connect4.DRAW_COLOR)
+                        game_ui.show_message(label)
+                        game_over = True
+                        game_ui.connect4.record_game(board)
+                    
+                    game_ui.connect4.turn += 1
+                    game_ui.connect4.turn %= 2
+                    
+                    # print_board(board)   
+                    game_ui.draw_board(board)
+                    
+                    if game_ui.connect4.PONDER and not game_over and not board.is_full():
+                        game_ui.connect4.start_pondering(board)
+                
+        # One screen update per tick, covering only what changed
+        game_ui.update_display()
+        clock.tick(game_ui.connect4.FPS)
     pygame.quit()
     sys.exit()
         
\ No newline at end of file
@@ -1,7 +1,10 @@
-import numpy as np
 import pygame
 import math
+import os
 import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from engine import CONNECT4_WEIGHTS, AIPlayer, Position, WindowEvaluator
 import random
 
 ROW_COUNTS, COL_COUNTS = 6, 7
@@ -9,6 +12,7 @@ BOARD_COLOR = (0, 0, 255)
 HOLE_COLOR = (0, 0, 0)
 PLAYER1_COLOR = (255, 0, 0)
 PLAYER2_COLOR = (255, 255, 0)
+DRAW_COLOR = (255, 255, 255)
 
 PLAYER = 0
 AI = 1
@@ -18,174 +22,57 @@ PLAYER_PIECE = 1
 AI_PIECE = 2
 
 DEPTH = 7
+TIME_BUDGET_MS = 1000
 
 ALPHA, BETA = -math.inf, math.inf
 
+SQUARESIZE = 100
+WIDTH = COL_COUNTS * SQUARESIZE
+HEIGHT = (ROW_COUNTS + 1) * SQUARESIZE
+RADIUS = int(SQUARESIZE / 2 - 5)
+
 WINDOW_LENGTH = 4
 
-def create_board():
-    board = np.zeros((6, 7))
+# Value of a window holding only the scoring player's pieces, or only the
+# opponent's, indexed by how many pieces it holds
+WINDOW_WEIGHTS, OPPONENT_WINDOW_WEIGHTS, CENTER_WEIGHT = CONNECT4_WEIGHTS
+
+def create_board(first_player=1):
+    board = Position(ROW_COUNTS, COL_COUNTS, first_player, WINDOW_LENGTH)
+    WindowEvaluator(board, WINDOW_WEIGHTS, OPPONENT_WINDOW_WEIGHTS, CENTER_WEIGHT)
     
     return board
 
-def drop_piece(board, row, col, piece):
-    board[row][col] = piece
+def drop_piece(board, col):
+    board.play(col)
 
 def is_valid_location(board, col):
-    return board[5][col] == 0
+    return board.can_play(col)
 
 def get_next_open_row(board, col):
-    for r in range(ROW_COUNTS):
-        if board[r][col] == 0:
-            return r
+    return board.heights[col]
 
 def print_board(board):
-    print(np.flip(board, axis = 0))    
+    print(board)    
     
 def winning_move(board, piece):
-    # Check all horizontal locations for win
-    
-    for c in range(COL_COUNTS - 3):
-        for r in range(ROW_COUNTS):
-            if board[r][c] == piece and board[r][c + 1] == piece and board[r][c + 2] == piece and board[r][c + 3] == piece:
-                return True
-    
-    # Check all vertical locations for win    
-    for r in range(ROW_COUNTS - 3):
-        for c in range(COL_COUNTS):
-            if board[r][c] == piece and board[r + 1][c] == piece and board[r + 2][c] == piece and board[r + 3][c] == piece:
-                return True
-    
-    # Check for positive slope diagonals
-    for r in range(ROW_COUNTS - 3):
-        for c in range(COL_COUNTS - 3):
-            if board[r][c] == piece and board[r + 1][c + 1] == piece and board[r + 2][c + 2] == piece and board[r + 3][c + 3] == piece:
-                return True
-    
-    #Check for negative slope diagonals
-    for r in range(3, ROW_COUNTS):
-        for c in range(COL_COUNTS - 3):
-            if board[r][c] == piece and board[r - 1][c + 1] == piece and board[r - 2][c + 2] == piece and board[r - 3][c + 3] == piece:
-                return True
-
-def evaluate_window(window, piece):
-    score = 0
-    OPPONENT_PIECE = PLAYER_PIECE
-    if piece == PLAYER_PIECE:
-        opponent_piece = AI_PIECE
-    
-    if window.count(piece) == 4:
-        score += 100
-    elif window.count(piece) == 3 and window.count(EMPTY) == 1:
-        score += 5
-    elif window.count(piece) == 2 and window.count(EMPTY) == 2:
-        score += 2
-        
-    if window.count(OPPONENT_PIECE) == 3 and window.count(EMPTY) == 1:
-        score -= 4
-        
-    return score
+    # The board tracks its winner as pieces are dropped
+    return board.winner == piece
 
 def score_position(board, piece):
-    score = 0
-    
-    # Center Piece Score
-    center_array = [int(i) for i in list(board[:, COL_COUNTS // 2])]
-    center_count = center_array.count(piece)
-    
-    score += center_count * 3
-
-    # Horizontal Score    
-    for r in range(ROW_COUNTS):
-        row_array = [int(i) for i in list(board[r, :])]
-        
-        for c in range(COL_COUNTS - 3):
-            window = row_array[c: c + WINDOW_LENGTH]
-            score += evaluate_window(window, piece)
-                
-    # Vertical Score
-    for r in range(COL_COUNTS):
-        col_array = [int(i) for i in list(board[: ,c])]
-        
-        for r in range(ROW_COUNTS - 3):
-            window = col_array[r: r + WINDOW_LENGTH] 
-            score += evaluate_window(window, piece)
-
-            
-    # Positive Slope Diagonals Score
-    for r in range(ROW_COUNTS - 3):
-        for c in range(COL_COUNTS - 3):
-            window = [board[r + i][c + i] for i in range(WINDOW_LENGTH)] 
-            score += evaluate_window(window, piece)
-            
-    # Negative Slope Diagonals Score
-    for r in range(ROW_COUNTS - 3):
-        for c in range(COL_COUNTS - 3):
-            window = [board[r + 3 - i][c + i] for i in range(WINDOW_LENGTH)]
-            score += evaluate_window(window, piece)
-
-    return score
+    # The board's evaluator keeps every window's score up to date as pieces are dropped
+    return board.evaluator.score(piece)
 
 def is_terminal_node(board):
-    return winning_move(board, PLAYER_PIECE) or winning_move(board, AI_PIECE) or len(get_valid_locations(board)) == 0
+    return board.winner != 0 or board.is_full()
 
 def minimax(board, depth, alpha, beta, maximizingPlayer):
-    valid_locations = get_valid_locations(board)
-    is_terminal = is_terminal_node(board)
-    if depth == 0 or is_terminal:
-        if is_terminal:
-            if winning_move(board, AI_PIECE):
-                return (None, 100000000000000)
-            elif winning_move(board, PLAYER_PIECE):
-                return (None, -100000000000000)
-            else: # Game is over, no more valid moves
-                return (None, 0)
-        else: # Depth is 0
-            return (None, score_position(board, AI_PIECE))
-            
-    if maximizingPlayer: 
-        value = -math.inf
-        column = random.choice(valid_locations)
-        
-        for col in valid_locations:
-            row = get_next_open_row(board, col)
-            board_copy = board.copy()
-            drop_piece(board_copy, row, col, AI_PIECE)
-            new_score = minimax(board_copy, depth - 1, alpha, beta, False)[1]
-            
-            if value < new_score:
-                value = new_score
-                column = col
-                
-            alpha = max(value, alpha)
-            
-            if alpha >= beta:
-                break
-
-        return column, value
-
-    else:
-        value = math.inf
-        column = random.choice(valid_locations)
-        
-        for col in valid_locations:
-            row = get_next_open_row(board, col)
-            board_copy = board.copy()
-            drop_piece(board_copy, row, col, PLAYER_PIECE)
-            new_score = minimax(board_copy, depth - 1, alpha, beta, True)[1]
-            
-            if value > new_score:
-                value = new_score
-                column = col
-                
-            beta = min(value, beta)
-            
-            if alpha >= beta:
-                break
-    
-        return column, value
+    # Alpha-beta search with a transposition table shared across turns
+    return ai.searcher.minimax(board, depth, alpha, beta, maximizingPlayer)
     
 
+ai = AIPlayer(AI_PIECE, CONNECT4_WEIGHTS, DEPTH, TIME_BUDGET_MS)
+
 def get_valid_locations(board):
     valid_locations = []
     
@@ -202,10 +89,9 @@ def pick_best_move(board, piece):
     best_col = random.choice(valid_locations)
     
     for col in valid_locations:
-        row = get_next_open_row(board, col)
-        temp_board = board.copy()
-        drop_piece(temp_board, row, col, piece)
-        score = score_position(temp_board, piece)
+        drop_piece(board, col)
+        score = score_position(board, piece)
+        board.undo()
         
         if best_score < score:
             best_score = score
@@ -213,7 +99,7 @@ def pick_best_move(board, piece):
             
     return best_col
 
-def draw_board(board):
+def draw_board(screen, board):
     for r in range(ROW_COUNTS):
         for c in range(COL_COUNTS):
             pygame.draw.rect(screen, BOARD_COLOR, (c * SQUARESIZE, r * SQUARESIZE + SQUARESIZE, SQUARESIZE, SQUARESIZE))
@@ -221,104 +107,118 @@ def draw_board(board):
     
     for r in range(ROW_COUNTS):
         for c in range(COL_COUNTS):
-            if board[r][c] == PLAYER_PIECE:
+            if board.cell(r, c) == PLAYER_PIECE:
                 pygame.draw.circle(screen, PLAYER1_COLOR, (c * SQUARESIZE + int(SQUARESIZE / 2), HEIGHT - (r * SQUARESIZE + int(SQUARESIZE / 2))), RADIUS)
-            elif board[r][c] == AI_PIECE:
+            elif board.cell(r, c) == AI_PIECE:
                 pygame.draw.circle(screen, PLAYER2_COLOR, (c * SQUARESIZE + int(SQUARESIZE / 2), HEIGHT - (r * SQUARESIZE  + int(SQUARESIZE / 2))), RADIUS)
 
     pygame.display.update() 
            
     
-board = create_board()
-print(board)
-game_over = False
+def main():
+    # Nothing above needs a display, so the AI can be imported without one
+    turn = random.randint(PLAYER, AI)
 
-pygame.init()
+    board = create_board(PLAYER_PIECE if turn == PLAYER else AI_PIECE)
+    print(board)
+    game_over = False
 
-SQUARESIZE = 100
-WIDTH = COL_COUNTS * SQUARESIZE
-HEIGHT = (ROW_COUNTS + 1) * SQUARESIZE
-RADIUS = int(SQUARESIZE / 2 - 5)
+    pygame.init()
 
+    SIZE = (WIDTH, HEIGHT)
 
-SIZE = (WIDTH, HEIGHT)
+    screen = pygame.display.set_mode(SIZE)
+    draw_board(screen, board)
 
-screen = pygame.display.set_mode(SIZE)
-draw_board(board)
+    display_font = pygame.font.SysFont("monospace", 75)
 
-display_font = pygame.font.SysFont("monospace", 75)
+    pygame.display.update()
 
-pygame.display.update()
-
-turn = random.randint(PLAYER, AI)
-
-while not game_over:
+    while not game_over:
     
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            sys.exit()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                sys.exit()
             
-        if event.type == pygame.MOUSEMOTION:
-            pygame.draw.rect(screen, HOLE_COLOR, (0, 0, WIDTH, SQUARESIZE))
+            if event.type == pygame.MOUSEMOTION:
+                pygame.draw.rect(screen, HOLE_COLOR, (0, 0, WIDTH, SQUARESIZE))
             
-            posx = event.pos[0]
+                posx = event.pos[0]
             
-            if turn == PLAYER:
-                pygame.draw.circle(screen, PLAYER1_COLOR, (posx, int(SQUARESIZE / 2)), RADIUS)
-            # else:
-            #     pygame.draw.circle(screen, PLAYER2_COLOR, (posx, int(SQUARESIZE / 2)), RADIUS)
+                if turn == PLAYER:
+                    pygame.draw.circle(screen, PLAYER1_COLOR, (posx, int(SQUARESIZE / 2)), RADIUS)
+                # else:
+                #     pygame.draw.circle(screen, PLAYER2_COLOR, (posx, int(SQUARESIZE / 2)), RADIUS)
                 
-        pygame.display.update()
+            pygame.display.update()
             
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            # print(event.pos)
-            # Ask for player 1 input
-            pygame.draw.rect(screen, HOLE_COLOR, (0, 0, WIDTH, SQUARESIZE))
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                # print(event.pos)
+                # Ask for player 1 input
+                pygame.draw.rect(screen, HOLE_COLOR, (0, 0, WIDTH, SQUARESIZE))
             
-            if turn == PLAYER:
-                posx = event.pos[0]
-                col = int(math.floor(posx / SQUARESIZE))
+                if turn == PLAYER:
+                    posx = event.pos[0]
+                    col = int(math.floor(posx / SQUARESIZE))
                 
-                if is_valid_location(board, col):
-                    row = get_next_open_row(board, col)
-                    drop_piece(board, row, col, 1)
+                    if is_valid_location(board, col):
+                        drop_piece(board, col)
                     
-                    if winning_move(board, PLAYER_PIECE):
-                        # print("Player 1 wins!")
-                        label = display_font.render("Player 1 Wins!!", 1, PLAYER1_COLOR)
-                        screen.blit(label, (40, 10))
+                        if winning_move(board, PLAYER_PIECE):
+                            # print("Player 1 wins!")
+                            label = display_font.render("Player 1 Wins!!", 1, PLAYER1_COLOR)
+                            screen.blit(label, (40, 10))
+                        
+                            game_over = True
+                        elif board.is_full():
+                            label = display_font.render("It's a draw!", 1, DRAW_COLOR)
+                            screen.blit(label, (40, 10))
                         
-                        game_over = True
+                            game_over = True
                         
-                    turn += 1
-                    turn %= 2
-                    print_board(board)        
-                    draw_board(board)
+                        turn += 1
+                        turn %= 2
+                        print_board(board)        
+                        draw_board(screen, board)
 
-            # # Ask for player 2 input
-    if turn == AI and not game_over:
+                # # Ask for player 2 input
+        if turn == AI and not game_over:
         
-        # col = pick_best_move(board, AI_PIECE)
-        col, score = minimax(board, DEPTH, ALPHA, BETA, True)
+            # col = pick_best_move(board, AI_PIECE)
+            # Deepen up to DEPTH plies while the time budget allows
+            col, score = ai.best_move(board)
         
-        if is_valid_location(board, col):
-            # pygame.time.wait(700)
-            row = get_next_open_row(board, col)
-            drop_piece(board, row, col, 2)
-            
-            if winning_move(board, AI_PIECE):
-                # print("Player 2 wins!")
-                label = display_font.render("Player 2 Wins!!", 1, PLAYER2_COLOR)
+            if col is None:
+                # No move left for the AI: the board is full
+                label = display_font.render("It's a draw!", 1, DRAW_COLOR)
                 screen.blit(label, (40, 10))
+                pygame.display.update()
                 game_over = True
+            elif is_valid_location(board, col):
+                # pygame.time.wait(700)
+                drop_piece(board, col)
+            
+                if winning_move(board, AI_PIECE):
+                    # print("Player 2 wins!")
+                    label = display_font.render("Player 2 Wins!!", 1, PLAYER2_COLOR)
+                    screen.blit(label, (40, 10))
+                    game_over = True
+                elif board.is_full():
+                    label = display_font.render("It's a draw!", 1, DRAW_COLOR)
+                    screen.blit(label, (40, 10))
+                    game_over = True
             
-            print_board(board)        
-            draw_board(board)
+                print_board(board)        
+                draw_board(screen, board)
             
     
-            turn += 1
-            turn %= 2
+                turn += 1
+                turn %= 2
     
-    if game_over:
-        pygame.time.wait(3000) # 2000 ms wait and then exit
-                
\ No newline at end of file
+        if game_over:
+            pygame.time.wait(3000) # 2000 ms wait and then exit
+                
+
+
+if __name__ == "__main__":
+    main()